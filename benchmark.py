@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# Benchmarks game iterations of Snakey Party (the rules rungame runs every frame, without drawing).
+# Runs a matrix of board sizes, snakes, tron mode (trailing), apples and bonus rounds; each scenario in its
+# own process, as board size is set when classes are imported (and so peak memory is that of one scenario).
+# python benchmark.py [--ticks N] [--quick] [--output file] [--baseline file] [--threshold percent]
+# Results are saved as JSON (benchmark.json by default); given a baseline (a saved result), scenarios whose
+# median tick time grew by more than threshold (10% by default) are reported, and exit status is 1.
+
+import gc, json, os, platform, subprocess, sys, time, timeit
+from classes.options import getOption
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+SIZES = [(640, 480), (1024, 768), (1920, 1080)]
+SNAKES = [['snakey', 'linus'], ['snakey', 'linus', 'wiggles', 'goober']]
+TRAILING = [False, True]
+APPLES = [1, 20]
+BONUS = [False, True]
+
+# game iterations with automatic garbage collection off, to count gc-tracked objects retained
+RETAINEDTICKS = 500
+# games are cut short after this many game iterations, so a long game does not make up a whole scenario
+MAXTICKS = 5000
+
+
+def getScenarios(quick=False):
+    """
+    Returns list of scenarios (dictionaries) to run. If quick, only smallest and largest boards.
+    """
+    scenarios = []
+    sizes = SIZES
+    if quick:
+        sizes = [SIZES[0], SIZES[-1]]
+    for width, height in sizes:
+        for players in SNAKES:
+            for trailing in TRAILING:
+                for apples in APPLES:
+                    for bonus in BONUS:
+                        scenarios.append({'width': width, 'height': height, 'players': players,
+                                          'trailing': trailing, 'apples': apples, 'bonus': bonus})
+    return scenarios
+
+
+def getName(scenario):
+    """
+    Returns name of scenario, unique within matrix (results are compared to baseline by name).
+    """
+    name = '%dx%d %d snakes apples=%d' % (scenario['width'], scenario['height'],
+                                          len(scenario['players']), scenario['apples'])
+    if scenario['trailing']:
+        name = name + ' trailing'
+    if scenario['bonus']:
+        name = name + ' bonus'
+    return name
+
+
+def getPercentile(values, percent):
+    """
+    Returns percentile (nearest rank) of sorted list of values.
+    """
+    rank = int(round(percent / 100.0 * len(values) + 0.5)) - 1
+    return values[max(0, min(rank, len(values) - 1))]
+
+
+def runScenario(scenario, ticks):
+    """
+    Runs scenario (in this process, whose board size must be that of scenario) for at least ticks game iterations.
+    Games are seeded 0, 1, 2... so every run of a scenario plays the same games.
+    Player's snake is not steered, as in rungame with no input.
+    Returns dictionary of results.
+    """
+    from classes.game import Game
+    from classes.simulation import Simulation
+
+    settings = {'apples': scenario['apples'], 'trailing': scenario['trailing']}
+    if scenario['bonus']:
+        # bonus round for every apple eaten
+        settings['bonusFruitTrigger'] = 1
+
+    # time every game iteration
+    times = []
+    seed = 0
+    while len(times) < ticks:
+        sim = Simulation(Game(seed=seed, **settings), scenario['players'])
+        while sim.gameover == False and sim.tick < MAXTICKS and len(times) < ticks:
+            start = timeit.default_timer()
+            sim.step()
+            times.append(timeit.default_timer() - start)
+        seed = seed + 1
+    games = seed
+    times.sort()
+
+    # replay same games with automatic garbage collection off, counting growth of gc-tracked objects (lists, dicts,
+    # instances...) -- containers left alive by a game iteration, not allocations: temporaries freed within it and
+    # objects gc does not track (ints, floats, strings) do not show up. Python 2 has no count of allocations.
+    retained = 0
+    counted = 0
+    seed = 0
+    gc.collect()
+    gc.disable()
+    while counted < min(ticks, RETAINEDTICKS):
+        sim = Simulation(Game(seed=seed, **settings), scenario['players'])
+        while sim.gameover == False and sim.tick < MAXTICKS and counted < min(ticks, RETAINEDTICKS):
+            before = gc.get_count()[0]
+            sim.step()
+            retained = retained + gc.get_count()[0] - before
+            counted = counted + 1
+        seed = seed + 1
+    gc.enable()
+
+    result = dict(scenario)
+    result['name'] = getName(scenario)
+    result['ticks'] = len(times)
+    result['games'] = games
+    result['median_ms'] = getPercentile(times, 50) * 1000
+    result['p99_ms'] = getPercentile(times, 99) * 1000
+    result['ticks_per_second'] = len(times) / sum(times)
+    result['gc_objects_retained_per_tick'] = float(retained) / counted
+    result['peak_memory_kb'] = None
+    if resource != None:
+        # kilobytes on Linux, bytes on Mac OS X
+        result['peak_memory_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            result['peak_memory_kb'] = result['peak_memory_kb'] / 1024
+    return result
+
+
+def runAll(scenarios, ticks):
+    """
+    Runs every scenario in a process of its own. Returns list of results.
+    """
+    results = []
+    for scenario in scenarios:
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--scenario',
+                                          json.dumps(scenario), '--ticks', str(ticks)])
+        result = json.loads(output.strip().splitlines()[-1])
+        print("%-45s median %7.3f ms  p99 %7.3f ms  %8.0f ticks/s  %6.1f gc objects retained/tick  %s KB" % \
+              (result['name'], result['median_ms'], result['p99_ms'], result['ticks_per_second'],
+               result['gc_objects_retained_per_tick'], result['peak_memory_kb']))
+        results.append(result)
+    return results
+
+
+def compareBaseline(results, baseline, threshold):
+    """
+    Prints change of median tick time of each scenario against baseline (results saved earlier).
+    Returns list of names of scenarios slower by more than threshold (percent).
+    """
+    previous = dict((result['name'], result) for result in baseline['results'])
+    regressions = []
+    print("")
+    print("%-45s %12s %12s %8s" % ('against baseline', 'baseline ms', 'median ms', 'change'))
+    for result in results:
+        if result['name'] not in previous:
+            continue
+        old = previous[result['name']]['median_ms']
+        change = (result['median_ms'] - old) / old * 100
+        flag = ''
+        if change > threshold:
+            flag = ' slower'
+            regressions.append(result['name'])
+        print("%-45s %12.3f %12.3f %+7.1f%%%s" % (result['name'], old, result['median_ms'], change, flag))
+    return regressions
+
+
+def main():
+    args = sys.argv[1:]
+    ticks = int(getOption(args, '--ticks', 2000))
+    if '--quick' in args:
+        ticks = int(getOption(args, '--ticks', 500))
+
+    # run a single scenario (in a process started by runAll); board size is set before classes are imported
+    if '--scenario' in args:
+        scenario = json.loads(getOption(args, '--scenario', '{}'))
+        sys.argv = [sys.argv[0], str(scenario['width']), str(scenario['height'])]
+        print(json.dumps(runScenario(scenario, ticks)))
+        return 0
+
+    results = runAll(getScenarios('--quick' in args), ticks)
+    output = getOption(args, '--output', 'benchmark.json')
+    f = open(output, 'w')
+    json.dump({'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+               'platform': platform.platform(), 'ticks': ticks, 'results': results}, f, indent=1, sort_keys=True)
+    f.close()
+    print("results saved to %s" % output)
+
+    baseline = getOption(args, '--baseline', False)
+    if baseline != False:
+        f = open(baseline)
+        regressions = compareBaseline(results, json.load(f), float(getOption(args, '--threshold', 10)))
+        f.close()
+        if len(regressions) > 0:
+            print("%d scenarios slower than baseline" % len(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,9 +12,8 @@ class Button():
     """
     def __init__(self, text, (x, y), key=None):
         self.text = str(text)
-        size = int (WINDOWWIDTH / 18)
-        self.font = pygame.font.Font('freesansbold.ttf', size) # FONT default?
-        self.startSurf = self.font.render(self.text, True, BUTTONCOLOR, BUTTONTEXT) # Refactor BUTTONCOLOR BUTTONTEXT -- must surf be self.?
+        self.size = int (WINDOWWIDTH / 18)
+        self.startSurf = methods.getText(self.text, self.size, BUTTONCOLOR, BUTTONTEXT) # Refactor BUTTONCOLOR BUTTONTEXT -- must surf be self.?
         self.rect = self.startSurf.get_rect()
         self.rect.center = x,y
         self.key = key
@@ -96,9 +95,9 @@ class SelectButton(Button):
         
     def display(self):
         if self.active == True:
-            self.startSurf = self.font.render(self.text, True, BUTTONCOLOR_SEL, BUTTONTEXT_SEL)
+            self.startSurf = methods.getText(self.text, self.size, BUTTONCOLOR_SEL, BUTTONTEXT_SEL)
         else:
-            self.startSurf = self.font.render(self.text, True, BUTTONCOLOR, BUTTONTEXT)
+            self.startSurf = methods.getText(self.text, self.size, BUTTONCOLOR, BUTTONTEXT)
             
         DISPLAYSURF.blit(self.startSurf, self.rect)
         
@@ -127,8 +126,8 @@ class InputButton(Button, SelectButton): # Don't deal w/ this yet
         # set-up center rectangle
         self.value = value
         size = int (WINDOWWIDTH / 18)
-        self.font = pygame.font.Font('freesansbold.ttf', size)
-        self.startSurf = self.font.render('-', True, BUTTONCOLOR, BUTTONTEXT)
+        self.size = size
+        self.startSurf = methods.getText('-', size, BUTTONCOLOR, BUTTONTEXT)
         self.rect = self.startSurf.get_rect()
         self.rect.center = x,y
         self.min = min
@@ -147,9 +146,9 @@ class InputButton(Button, SelectButton): # Don't deal w/ this yet
 
     def display(self):
         if self.active == True:
-            self.startSurf = self.font.render(str(self.value), True, BUTTONCOLOR_SEL, BUTTONTEXT_SEL)
+            self.startSurf = methods.getText(str(self.value), self.size, BUTTONCOLOR_SEL, BUTTONTEXT_SEL)
         else:
-            self.startSurf = self.font.render(str(self.value), True, BUTTONCOLOR, BUTTONTEXT)
+            self.startSurf = methods.getText(str(self.value), self.size, BUTTONCOLOR, BUTTONTEXT)
 
         DISPLAYSURF.blit(self.startSurf, self.rect)
         DISPLAYSURF.blit(self.decreaseSurf, self.decrease)
@@ -1,12 +1,15 @@
 #!/usr/bin/env python
 
-import sys, pygame
+import os, sys, pygame
 
 
 FPS = 12
 MIN_FPS = 3
 MAX_FPS = 60 # find out true max/min - display?
 FREEZING_POINT = 9  # target FPS when Blueberry (slow) is in effect.
+RENDER_FPS = 60  # frames drawn per second; game iterations run at game speed (FPS above), see classes/loop.py
+MAX_STEPS = 5  # most game iterations run between two frames; a longer stall slows game down instead
+MAX_SKIP = 3  # most frames left undrawn in a row while frames take longer than their time (see loop.FrameBudget)
 
 # set width and height of screen - optional arguments:
 # python snakey_party.py [width] [height]
@@ -15,11 +18,13 @@ if len(sys.argv) > 1:
         WINDOWWIDTH = int(sys.argv[1])
     except ValueError:
         print("Width is not an integer.")
+        WINDOWWIDTH = 640
     if len(sys.argv) > 2:
         try:
             WINDOWHEIGHT = int(sys.argv[2])
         except ValueError:
             print("Height is not an integer.")
+            WINDOWHEIGHT = 480
     else:
         WINDOWHEIGHT = 480
 else:
@@ -87,7 +92,23 @@ EGGTIMER = (40, 70)
 
 global FPSCLOCK, DISPLAYSURF, DEBUG
 
-pygame.init()
+# the window is only opened by initDisplay() -- headless simulations never open one.
 FPSCLOCK = pygame.time.Clock()
-DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
-DEBUG = False
\ No newline at end of file
+DISPLAYSURF = None
+DEBUG = False
+
+# directory every game played is recorded to (see classes/replay.py); set by SNAKEY_REPLAYDIR, not recorded if unset.
+REPLAYDIR = os.environ.get('SNAKEY_REPLAYDIR', False)
+# file timers and counters of every game played are written to (see classes/metrics.py); set by SNAKEY_METRICS,
+# not measured if unset. Prometheus text format if it ends with '.prom', otherwise JSON lines.
+METRICSFILE = os.environ.get('SNAKEY_METRICS', False)
+
+
+def initDisplay():
+    """
+    Initializes pygame and opens the game window.
+    Other classes modules copy DISPLAYSURF when imported, so this must be called before importing them.
+    """
+    global DISPLAYSURF
+    pygame.init()
+    DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
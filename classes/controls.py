@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import timeit
+from collections import deque
+from pygame.locals import *
+from const import *
+from simulation import OPPOSITE
+
+
+# direction each arrow key turns player's snake
+KEYDIRECTIONS = {K_UP: UP, K_DOWN: DOWN, K_LEFT: LEFT, K_RIGHT: RIGHT}
+
+# most turns a player can have waiting; keys pressed beyond it are dropped
+TURNQUEUESIZE = 3
+
+
+class TurnQueue:
+    """
+    Turns (arrow keys) of a player waiting to be taken by their snake, in order pressed, one per game iteration --
+    so quick double turns (e.g. a U-turn) are each taken, however many are pressed between two game iterations.
+    A turn is queued only if it changes direction without reversing it, checked against the last turn queued
+    (snake's direction if none is).
+    snake - snake steered by player.
+    turns - deque of (direction, time key was pressed), oldest first.
+    size - most turns queued.
+    dropped - number of turns dropped as queue was full.
+    metrics - Metrics the latency of every turn taken (from key pressed to game iteration taking it) is added to,
+              and turns taken and dropped are counted by; False (default) to not measure.
+    """
+    def __init__(self, snake, metrics=False, size=TURNQUEUESIZE):
+        self.snake = snake
+        self.turns = deque()
+        self.size = size
+        self.dropped = 0
+        self.metrics = metrics
+
+    def push(self, direction, pressed=False):
+        """
+        Queues turn to direction, pressed at given time (seconds, timeit.default_timer; now if not given).
+        Returns True if turn was queued.
+        """
+        if pressed == False:
+            pressed = timeit.default_timer()
+        last = self.snake.direction
+        if len(self.turns) > 0:
+            last = self.turns[-1][0]
+        if direction == last or direction == OPPOSITE[last]:
+            return False
+        if len(self.turns) >= self.size:
+            self.dropped = self.dropped + 1
+            if self.metrics:
+                self.metrics.count('turns_dropped')
+            return False
+        self.turns.append((direction, pressed))
+        return True
+
+    def pop(self):
+        """
+        Turns snake to next direction queued; called before every game iteration.
+        Returns latency of turn taken (seconds since its key was pressed), False if no turn was taken.
+        """
+        while len(self.turns) > 0:
+            direction, pressed = self.turns.popleft()
+            # snake may have been turned since turn was queued (a new game iteration, a replay...)
+            if direction != self.snake.direction and direction != OPPOSITE[self.snake.direction]:
+                self.snake.direction = direction
+                latency = timeit.default_timer() - pressed
+                if self.metrics:
+                    self.metrics.observe('input_latency', latency)
+                    self.metrics.count('turns')
+                return latency
+        return False
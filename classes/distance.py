@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+
+import heapq
+from array import array
+from collections import deque
+from const import *
+from grid import *
+
+
+# distance of cells no fruit can be reached from
+UNREACHABLE = 1 << 30
+
+
+class DistanceMaps:
+    """
+    Distance (in moves, around snakes) from every cell to nearest fruit of each type, shared by all AIs.
+    Maps of a fruit type are rebuilt (breadth first search from all its fruit) when fruit of that type is added or removed.
+    As snakes move, cells they enter or leave are patched into maps without rebuilding them.
+    distances - list of maps (one per fruit type, in order of FRUITTYPES); each an array with a distance for every cell.
+    blocked - cells holding a snake, as maps were last updated.
+    fruit - fruit code of every cell, as maps were last updated.
+    changed - cells grid reported as changed since last update.
+    """
+    def __init__(self, grid, depth=20):
+        self.depth = depth
+        self.distances = [array('i', [UNREACHABLE]) * GRIDSIZE for fruit in FRUITTYPES]
+        self.blocked = bytearray(GRIDSIZE)
+        self.fruit = bytearray(GRIDSIZE)
+        self.changed = set()
+        grid.watchers.append(self)
+
+    def cellChanged(self, cell):
+        """
+        Called by grid for every change to a cell.
+        """
+        self.changed.add(cell)
+
+    def isOpen(self, cell):
+        """
+        Returns True if cell is on playing area and holds no snake.
+        """
+        return PLAYFIELD[cell] and not self.blocked[cell]
+
+    def update(self, grid):
+        """
+        Brings maps up to date with grid.
+        """
+        # fruit types that were added or removed are rebuilt
+        rebuild = set()
+        for cell in self.changed:
+            if grid.fruit[cell] != self.fruit[cell]:
+                if self.fruit[cell]:
+                    rebuild.add(self.fruit[cell] - 1)
+                if grid.fruit[cell]:
+                    rebuild.add(grid.fruit[cell] - 1)
+                self.fruit[cell] = grid.fruit[cell]
+
+        # other maps are patched, one cell at a time
+        for cell in self.changed:
+            blocked = grid.snake[cell] > 0
+            if blocked != bool(self.blocked[cell]):
+                self.blocked[cell] = blocked
+                for index in range(len(FRUITTYPES)):
+                    if index not in rebuild:
+                        if blocked:
+                            self.block(self.distances[index], cell)
+                        else:
+                            self.unblock(self.distances[index], cell, index + 1)
+        self.changed = set()
+
+        for index in rebuild:
+            self.rebuild(index)
+
+    def rebuild(self, index):
+        """
+        Recomputes map of fruit type (index in FRUITTYPES), searching from all its fruit at once.
+        """
+        code = index + 1
+        distance = array('i', [UNREACHABLE]) * GRIDSIZE
+        queue = deque()
+        for cell in range(GRIDSIZE):
+            if self.fruit[cell] == code and self.isOpen(cell):
+                distance[cell] = 0
+                queue.append(cell)
+        while len(queue) > 0:
+            cell = queue.popleft()
+            for neighbor in (cell - 1, cell + 1, cell - STRIDE, cell + STRIDE):
+                if distance[neighbor] == UNREACHABLE and self.isOpen(neighbor):
+                    distance[neighbor] = distance[cell] + 1
+                    queue.append(neighbor)
+        self.distances[index] = distance
+
+    def unblock(self, distance, cell, code):
+        """
+        Patches map for cell no longer holding a snake: paths through it can only get shorter.
+        """
+        if not PLAYFIELD[cell]:
+            return
+        if self.fruit[cell] == code:
+            distance[cell] = 0
+        else:
+            for neighbor in (cell - 1, cell + 1, cell - STRIDE, cell + STRIDE):
+                if self.isOpen(neighbor) and distance[neighbor] + 1 < distance[cell]:
+                    distance[cell] = distance[neighbor] + 1
+        if distance[cell] == UNREACHABLE:
+            return
+        queue = deque([cell])
+        while len(queue) > 0:
+            cell = queue.popleft()
+            for neighbor in (cell - 1, cell + 1, cell - STRIDE, cell + STRIDE):
+                if self.isOpen(neighbor) and distance[cell] + 1 < distance[neighbor]:
+                    distance[neighbor] = distance[cell] + 1
+                    queue.append(neighbor)
+
+    def block(self, distance, cell):
+        """
+        Patches map for cell now holding a snake.
+        Cells whose every shortest path went through it are found (nearest first), then given new distances from their surroundings.
+        """
+        old = distance[cell]
+        distance[cell] = UNREACHABLE
+        if old == UNREACHABLE:
+            return
+
+        # find cells that lost all their shortest paths
+        lost = set([cell])
+        affected = []
+        queue = deque(neighbor for neighbor in (cell - 1, cell + 1, cell - STRIDE, cell + STRIDE)
+                      if self.isOpen(neighbor) and distance[neighbor] == old + 1)
+        while len(queue) > 0:
+            current = queue.popleft()
+            if current in lost:
+                continue
+            supported = False
+            for neighbor in (current - 1, current + 1, current - STRIDE, current + STRIDE):
+                if neighbor not in lost and self.isOpen(neighbor) and distance[neighbor] == distance[current] - 1:
+                    supported = True
+                    break
+            if supported:
+                continue
+            lost.add(current)
+            affected.append(current)
+            for neighbor in (current - 1, current + 1, current - STRIDE, current + STRIDE):
+                if neighbor not in lost and self.isOpen(neighbor) and distance[neighbor] == distance[current] + 1:
+                    queue.append(neighbor)
+
+        # give affected cells distances from their unaffected neighbors, then spread shortest first
+        for current in affected:
+            distance[current] = UNREACHABLE
+        heap = []
+        for current in affected:
+            for neighbor in (current - 1, current + 1, current - STRIDE, current + STRIDE):
+                if neighbor not in lost and self.isOpen(neighbor) and distance[neighbor] + 1 < distance[current]:
+                    distance[current] = distance[neighbor] + 1
+            if distance[current] != UNREACHABLE:
+                heap.append((distance[current], current))
+        heapq.heapify(heap)
+        while len(heap) > 0:
+            value, current = heapq.heappop(heap)
+            if value > distance[current]:
+                continue
+            for neighbor in (current - 1, current + 1, current - STRIDE, current + STRIDE):
+                if self.isOpen(neighbor) and value + 1 < distance[neighbor]:
+                    distance[neighbor] = value + 1
+                    heapq.heappush(heap, (value + 1, neighbor))
+
+    def getInfluence(self, cell, neighbor, weights):
+        """
+        Returns score of moving from cell to neighbor: for each fruit type in reach (within depth moves),
+        its weight (in order of FRUITTYPES) times depth less distance from neighbor. Snakes are not weighted; they block paths.
+        Same for every direction apart from neighbor, so only differences between directions matter.
+        """
+        score = 0
+        for index in range(len(FRUITTYPES)):
+            if self.distances[index][neighbor] < self.depth:
+                score = score + weights[index] * (self.depth - self.distances[index][neighbor])
+        return score
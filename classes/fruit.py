@@ -3,40 +3,33 @@
 import random, pygame, sys
 from pygame.locals import *
 from const import *
+from grid import *
 from snake import *
 
 
+# images of fruit, by what they look like (see Fruit.getTileKey) -- shared by all fruit
+FRUITTILES = {}
+
+
 class Fruit:
     """
     Fruit class houses all information for fruit objects. 
     Base class is not meant to be instantiated, but rather provide base methods shared by all fruit.
+    Fruit are placed at a random location, unless coords are given when created.
     """
     def __init__(self):
         self.timer = 0
 
     def getRandomLocation(self, allfruit, allsnake, game):
         """
-        Returns random coordinates (for fruit to be placed). Ensures that coordinates are not occupied by fruit or snake head.
+        Returns random coordinates (for fruit to be placed), drawn from cells free of fruit and snakes in game's grid.
         Will keep fruit away from edges (outside 20%) if in an "easy mode" determined in Tally object.
+        Returns False if there is no free cell.
         """
-        while True:
-            conflict = False
-            if game.checkEasyTrigger():
-                x = random.randint(int(CELLWIDTH/5), CELLWIDTH - int(CELLWIDTH/5) - 1)
-                y = random.randint(int(CELLHEIGHT/5), CELLHEIGHT - int(CELLHEIGHT/5) - 1)
-            else:
-                x = random.randint(0, CELLWIDTH - 1)
-                y = random.randint((TOP_BUFFER / CELLSIZE), CELLHEIGHT - 1)
-            # ensure coordinates are not already occupied by fruit
-            for fruit in allfruit:
-                if fruit.coords['x'] == x and fruit.coords['y'] == y:
-                    conflict = True
-            # ensure coordinates are not already occupied by snake head
-            for snake in allsnake:
-                if snake.getCoords('x') == x and snake.getCoords('y') == y:
-                    conflict = True
-            if conflict == False:
-                return {'x':x, 'y':y}
+        cell = game.grid.getFreeCell(game.random, game.checkEasyTrigger())
+        if cell == False:
+            return False
+        return {'x':getCellX(cell), 'y':getCellY(cell)}
 
     def updateTimer(self):
         """
@@ -52,10 +45,30 @@ class Fruit:
         """
         Responsible for drawing fruit image to screen.
         """
-        x = self.coords['x'] * CELLSIZE
-        y = self.coords['y'] * CELLSIZE
-        fruitRect = pygame.Rect(x, y, CELLSIZE, CELLSIZE)
-        pygame.draw.rect(DISPLAYSURF, self.color, fruitRect)
+        DISPLAYSURF.blit(self.getTile(), (self.coords['x'] * CELLSIZE, self.coords['y'] * CELLSIZE))
+
+    def getTile(self):
+        """
+        Returns image (CELLSIZE square) of fruit, drawn on first use by any fruit that looks the same.
+        """
+        key = self.getTileKey()
+        if key not in FRUITTILES:
+            tile = pygame.Surface((CELLSIZE, CELLSIZE)).convert(DISPLAYSURF)
+            self.drawTile(tile)
+            FRUITTILES[key] = tile
+        return FRUITTILES[key]
+
+    def getTileKey(self):
+        """
+        Returns what fruit looks like (fruit that look the same share an image).
+        """
+        return (self.name, self.color)
+
+    def drawTile(self, tile):
+        """
+        Draws fruit onto its image.
+        """
+        pygame.draw.rect(tile, self.color, pygame.Rect(0, 0, CELLSIZE, CELLSIZE))
 
 
 class Apple(Fruit):
@@ -63,8 +76,11 @@ class Apple(Fruit):
     Apples are a unique fruit in that they never leave the screen and once one is eaten, it is always replaced with another.
     They also add points and one growth
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'apple'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
         self.color = RED
         self.points = 10
         self.growth = 1
@@ -84,9 +100,12 @@ class Poison(Fruit):
     """
     Poison will shorten a snake (by adding a negative growth value) and reduce points.
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
-        self.timer = random.randint(POISONTIMER[0], POISONTIMER[1])
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'poison'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
+        self.timer = game.random.randint(POISONTIMER[0], POISONTIMER[1])
         self.color = GREEN
         self.points = -25
         self.growth = -3
@@ -109,9 +128,12 @@ class Orange(Fruit):
     """
     Orange will grow snake substantially and are worth points.
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
-        self.timer = random.randint(ORANGETIMER[0], ORANGETIMER[1])
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'orange'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
+        self.timer = game.random.randint(ORANGETIMER[0], ORANGETIMER[1])
         self.color = ORANGE
         self.points = 50
         self.growth = 3
@@ -134,9 +156,12 @@ class Raspberry(Fruit):
     """
     Raspberry will set snake's multiplier to two for a period of time.
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
-        self.timer = random.randint(RASPBERRYTIMER[0], RASPBERRYTIMER[1])
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'raspberry'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
+        self.timer = game.random.randint(RASPBERRYTIMER[0], RASPBERRYTIMER[1])
         self.color = PURPLE
         self.multiplier = 2
         self.multipliertimer = 100
@@ -159,9 +184,12 @@ class Blueberry(Fruit):
     Blueberry will reduce the frame rate (slowing down game iterations) for a period of time.
     It is also worth a lot of points.
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
-        self.timer = random.randint(BLUEBERRYTIMER[0], BLUEBERRYTIMER[1])
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'blueberry'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
+        self.timer = game.random.randint(BLUEBERRYTIMER[0], BLUEBERRYTIMER[1])
         self.color = BLUE
         self.score = 100
         self.slowtimer = 80
@@ -183,9 +211,12 @@ class Lemon(Fruit):
     """
     Lemon will grow snake to mythic proportions.
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
-        self.timer = random.randint(LEMONTIMER[0], LEMONTIMER[1])
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'lemon'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
+        self.timer = game.random.randint(LEMONTIMER[0], LEMONTIMER[1])
         self.color = YELLOW
         self.score = 500
         self.growth = 20
@@ -208,9 +239,12 @@ class Egg(Fruit):
     """
     Eggs spawn another snake if not eaten.
     """
-    def __init__(self, allfruit, allsnake, game):
-        self.coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
-        self.timer = random.randint(EGGTIMER[0], EGGTIMER[1])
+    def __init__(self, allfruit, allsnake, game, coords=False):
+        self.name = 'egg'
+        if coords == False:
+            coords = Fruit.getRandomLocation(self, allfruit, allsnake, game)
+        self.coords = coords
+        self.timer = game.random.randint(EGGTIMER[0], EGGTIMER[1])
         self.color = GOLDENROD
         self.colorBorder = WHITE
         self.points = 250
@@ -236,7 +270,7 @@ class Egg(Fruit):
             self.radius = CELLSIZE / 5
         return Fruit.updateTimer(self)
 
-    def isHatched(self, allsnake):
+    def isHatched(self, allsnake, game):
         """
         Add new snake with coords as coords of fruit, and growth of 3.
         Snake is not scored (name and score does not appear).
@@ -244,17 +278,26 @@ class Egg(Fruit):
         junior = Opponent('junior', [{'x':self.coords['x'] , 'y':self.coords['y']}], PINK, GREEN, 10, 10, -20, [35, 5, 40, 30, 35, 15, 0])
         junior.growth = 3
         junior.scored = False
-        allsnake.append(junior)
+        game.addSnake(junior, allsnake)
 
     def drawFruit(self):
+        Fruit.drawFruit(self)
+
+    def getTileKey(self):
         """
-        Responsible for drawing image to screen.
+        Eggs look different as their radius shrinks.
         """
-        x = self.coords['x'] * CELLSIZE
-        y = self.coords['y'] * CELLSIZE
-        xNext = (self.coords['x'] + 1) * CELLSIZE
-        yNext = (self.coords['y'] + 1) * CELLSIZE
-        center = ((xNext + x) / 2, (yNext + y) / 2)
-        fruitRect = pygame.Rect(x, y, CELLSIZE, CELLSIZE)
-        pygame.draw.rect(DISPLAYSURF, self.colorBorder, fruitRect)
-        pygame.draw.circle(DISPLAYSURF, self.color, center, self.radius)
+        return (self.name, self.color, self.colorBorder, self.radius)
+
+    def drawTile(self, tile):
+        """
+        Responsible for drawing image of egg.
+        """
+        fruitRect = pygame.Rect(0, 0, CELLSIZE, CELLSIZE)
+        pygame.draw.rect(tile, self.colorBorder, fruitRect)
+        pygame.draw.circle(tile, self.color, fruitRect.center, self.radius)
+
+
+# fruit classes by name
+FRUITCLASSES = {'apple': Apple, 'poison': Poison, 'orange': Orange, 'raspberry': Raspberry,
+                'blueberry': Blueberry, 'lemon': Lemon, 'egg': Egg}
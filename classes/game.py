@@ -5,6 +5,12 @@ from pygame.locals import *
 from const import *
 from methods import *
 from fruit import *
+from grid import *
+from renderer import Renderer
+
+
+# empty board (background and grid) for each screen size and grid color (see Game.getBackground)
+BACKGROUNDS = {}
 
 
 class Game:
@@ -16,19 +22,27 @@ class Game:
     easyTrigger - a threshold (apples consumed); once reached fruit can be placed anywhere on screen (as opposed to away from edges).
     currentplace - the current 'place' of snake. When snake has died.
     apples - number of apples on screen.
+    perception - how AIs see the board: 'look' (each AI searches around itself), 'field' (influence field shared by all AIs, needs NumPy)
+                 or 'distance' (distances to fruit around snakes, shared by all AIs).
+    seed - seed for random number generator of game (any integer, 0 included); False picks a new one for every game run.
+    currentseed - seed of game being run (seed, or the one picked), to reproduce it.
+    random - random number generator every random choice of game is drawn from (see startRandom).
+    settings - keyword arguments game was created with (to record it in replays).
+    dirtyRects - redraw only what changed between frames (default), instead of the whole screen.
+    maxSkip - most frames left undrawn in a row when frames take longer than their time (see loop.FrameBudget);
+              0 draws every frame.
+    renderer - Renderer drawing screen of game being run, when dirtyRects is set (created by drawScreen).
+    grid - occupancy grid of game being run (set by Simulation); kept up to date by addSnake/addFruit/removeFruit.
+    fruitAt - dictionary of cell to fruit in it, of game being run; kept up to date by addFruit/removeFruit.
+    status - line shown under keys that can be pressed when player is dead (turbo speed, see rungame); False for none.
     """
     def __init__(self, **kwargs):
+        self.settings = dict(kwargs)
         # defaults
-        self.fruitEaten = {'apple':0, 'poison':0, 'orange':0, 'raspberry':0,
-                           'blueberry':0, 'lemon':0, 'egg':0}
         self.speedTrigger = kwargs.get('speedTrigger', 20)
         self.bonusFruitTrigger = kwargs.get('bonusFruitTrigger', 10)
         self.easyTrigger = kwargs.get('easyTrigger', 20)
-        self.currentplace = 1
         self.apples = kwargs.get('apples', 1)
-        self.basespeed = kwargs.get('basespeed', FPS)
-        self.currentspeed = self.basespeed
-        self.slowtimer = 0
         self.trailing = kwargs.get('trailing', False)
         self.poisonDrop = kwargs.get('poisonDrop', 4)
         self.orangeDrop = kwargs.get('orangeDrop', 5)
@@ -36,8 +50,42 @@ class Game:
         self.blueberryDrop = kwargs.get('blueberryDrop', 25)
         self.lemonDrop = kwargs.get('lemonDrop', 100)
         self.eggDrop = kwargs.get('eggDrop', 20)
+        self.perception = kwargs.get('perception', 'look')
+        self.seed = kwargs.get('seed', False)
+        self.dirtyRects = kwargs.get('dirtyRects', True)
+        self.maxSkip = kwargs.get('maxSkip', MAX_SKIP)
+        self.renderer = False
+        self.status = False
+        self.reset()
+        self.grid = False
 
 
+    def reset(self):
+        """
+        Starts a new game run: fruit eaten, speed and places are set back to the start, and a new random number
+        generator is created (see startRandom). A game (mode picked from menu) is run many times, and a run
+        plays out the same way for a given seed only if it starts from the same state.
+        """
+        self.fruitEaten = {'apple':0, 'poison':0, 'orange':0, 'raspberry':0,
+                           'blueberry':0, 'lemon':0, 'egg':0}
+        self.currentplace = 1
+        self.basespeed = self.settings.get('basespeed', FPS)
+        self.currentspeed = self.basespeed
+        self.slowtimer = 0
+        self.fruitAt = {}
+        self.startRandom()
+
+    def startRandom(self):
+        """
+        Creates new random number generator for a game run, from seed if set (otherwise from a new random seed).
+        Seed used is kept in currentseed, so game can be reproduced.
+        """
+        if self.seed is False:
+            self.currentseed = random.randint(0, 2 ** 32 - 1)
+        else:
+            self.currentseed = self.seed
+        self.random = random.Random(self.currentseed)
+
     def checkSpeedTrigger(self):
         """
         Returns true if number of apples consumed modulo speedTrigger equals zero.
@@ -107,6 +155,17 @@ class Game:
             elif self.currentspeed > goal:
                 self.currentspeed = self.currentspeed - 1
 
+    def updateSpeed(self):
+        """
+        Adjusts currentspeed one towards FREEZING_POINT while slowtimer is running, otherwise towards basespeed.
+        Run once every game iteration.
+        """
+        if self.checkSlowTimer():
+            self.updateSlowTimer()
+            self.updateCurrentSpeed(FREEZING_POINT)
+        else:
+            self.updateCurrentSpeed()
+
     def checkSlowTimer(self):
         """
         Returns true if slowtimer is greater than 0.
@@ -122,38 +181,83 @@ class Game:
         """
         self.slowtimer = self.slowtimer - 1
         
+    def addSnake(self, snake, allsnake):
+        """
+        Adds snake to game, and its segments to grid.
+        """
+        allsnake.append(snake)
+        if self.grid:
+            for cell in snake.coords:
+                self.grid.addSnake(cell)
+
+    def addFruit(self, fruit, allfruit):
+        """
+        Adds fruit to game, and to grid.
+        Fruit that could not be placed (no free cell) is dropped; returns False in that case.
+        """
+        if fruit.coords == False:
+            return False
+        allfruit.append(fruit)
+        self.fruitAt[getCell(fruit.coords['x'], fruit.coords['y'])] = fruit
+        if self.grid:
+            self.grid.addFruit(fruit)
+        return True
+
+    def addFruits(self, names, allfruit, allsnake):
+        """
+        Adds fruit (list of names) to game in one go, placed in distinct cells drawn at once from grid.
+        Fruit that does not fit on board (no free cell left) is not added.
+        """
+        cells = self.grid.getFreeCells(len(names), self.random, self.checkEasyTrigger())
+        for name, cell in zip(names, cells):
+            fruit = FRUITCLASSES[name](allfruit, allsnake, self, {'x':getCellX(cell), 'y':getCellY(cell)})
+            self.addFruit(fruit, allfruit)
+
+    def removeFruit(self, fruit, allfruit):
+        """
+        Removes fruit (eaten or expired) from game, and from grid.
+        """
+        # found by identity: list.remove compares fruit with == (slow for instances), one by one
+        for index, item in enumerate(allfruit):
+            if item is fruit:
+                del allfruit[index]
+                break
+        del self.fruitAt[getCell(fruit.coords['x'], fruit.coords['y'])]
+        if self.grid:
+            self.grid.removeFruit(fruit)
+
     def runDrop(self, allfruit, allsnake):
         """
         Adds fruit randomly to screen.
         If newapple is turned on, replaces apple that was eaten.
         """
         # chance of poison drop
-        if self.poisonDrop != False and random.randint(1,self.poisonDrop) == 1:
+        if self.poisonDrop != False and self.random.randint(1,self.poisonDrop) == 1:
             p = Poison(allfruit, allsnake, self)
-            allfruit.append(p)
+            self.addFruit(p, allfruit)
         # chance of orange drop
-        if self.orangeDrop != False and random.randint(1,self.orangeDrop) == 1:
+        if self.orangeDrop != False and self.random.randint(1,self.orangeDrop) == 1:
             o = Orange(allfruit, allsnake, self)
-            allfruit.append(o)
+            self.addFruit(o, allfruit)
         # chance of raspberry drop
-        if self.raspberryDrop != False and random.randint(1,self.raspberryDrop) == 1:
+        if self.raspberryDrop != False and self.random.randint(1,self.raspberryDrop) == 1:
             r = Raspberry(allfruit, allsnake, self)
-            allfruit.append(r)
+            self.addFruit(r, allfruit)
         # chance of blueberry drop
-        if self.blueberryDrop != False and random.randint(1,self.blueberryDrop) == 1:
+        if self.blueberryDrop != False and self.random.randint(1,self.blueberryDrop) == 1:
             b = Blueberry(allfruit, allsnake, self)
-            allfruit.append(b)
+            self.addFruit(b, allfruit)
         # chance of lemon drop
-        if self.lemonDrop != False and random.randint(1,self.lemonDrop) == 1:
+        if self.lemonDrop != False and self.random.randint(1,self.lemonDrop) == 1:
             l = Lemon(allfruit, allsnake, self)
-            allfruit.append(l)
+            self.addFruit(l, allfruit)
         # chance of egg drop
-        if self.eggDrop != False and random.randint(1,self.eggDrop) == 1:
+        if self.eggDrop != False and self.random.randint(1,self.eggDrop) == 1:
             e = Egg(allfruit, allsnake, self)
-            allfruit.append(e)
+            self.addFruit(e, allfruit)
         # create new apple
         a = Apple(allfruit, allsnake, self)
-        allfruit.append(a)
+        self.addFruit(a, allfruit)
 
     def runBonusFruit(self, allfruit, allsnake):
         """
@@ -163,7 +267,7 @@ class Game:
         Default will contain an assortment of fruit.
         """
         bonus = []
-        type = random.randint(1, 20)
+        type = self.random.randint(1, 20)
         
         # drop amounts based on size of playing field
         squares = CELLWIDTH * CELLHEIGHT
@@ -176,111 +280,154 @@ class Game:
         
         # based on bonus type, create fruits
         if type == 1:
-            counter = random.randint(smallLower,smallUpper)
+            counter = self.random.randint(smallLower,smallUpper)
             while counter > 0:
                 bonus.append('egg')
                 counter = counter - 1
         elif type == 2 or type == 3:
-            counter = random.randint(largeLower,largeUpper)
+            counter = self.random.randint(largeLower,largeUpper)
             while counter > 0:
                 bonus.append('poison')
                 counter = counter - 1
         elif type == 4 or type == 5:
-            counter = random.randint(largeLower,largeUpper)
+            counter = self.random.randint(largeLower,largeUpper)
             while counter > 0:
                 bonus.append('orange')
                 counter = counter - 1
         elif type == 6:
-            counter = random.randint(largeLower,largeUpper)
+            counter = self.random.randint(largeLower,largeUpper)
             while counter > 0:
                 bonus.append('raspberry')
                 counter = counter - 1
         elif type == 7:
-            counter = random.randint(largeLower,largeUpper)
+            counter = self.random.randint(largeLower,largeUpper)
             while counter > 0:
                 bonus.append('blueberry')
                 counter = counter - 1
         # default bonus
         else:
-            counter = random.randint(tinyLower, tinyUpper)
+            counter = self.random.randint(tinyLower, tinyUpper)
             while counter > 0:
                 bonus.append('poison')
                 counter = counter - 1
-            counter = random.randint(5,20)
+            counter = self.random.randint(5,20)
             while counter > 0:
                 bonus.append('orange')
                 counter = counter - 1
-            counter = random.randint(tinyLower, tinyUpper)
+            counter = self.random.randint(tinyLower, tinyUpper)
             while counter > 0:
                 bonus.append('raspberry')
                 counter = counter - 1
-            counter = random.randint(tinyLower, tinyUpper)
+            counter = self.random.randint(tinyLower, tinyUpper)
             while counter > 0:
                 bonus.append('blueberry')
                 counter = counter - 1
         
         # add fruits
-        for bonusfruit in bonus:
-            if bonusfruit == 'poison':
-                f = Poison(allfruit, allsnake, self)
-            elif bonusfruit == 'orange':
-                f = Orange(allfruit, allsnake, self)
-            elif bonusfruit == 'raspberry':
-                f = Raspberry(allfruit, allsnake, self)
-            elif bonusfruit == 'blueberry':
-                f = Blueberry(allfruit, allsnake, self)
-            elif bonusfruit == 'lemon':
-                f = Lemon(allfruit, allsnake, self)
-            elif bonusfruit == 'egg':
-                f = Egg(allfruit, allsnake, self)
-            allfruit.append(f)
+        self.addFruits(bonus, allfruit, allsnake)
             
-    def drawScreen(self, allfruit, allsnake, player):
+    def drawScreen(self, allfruit, allsnake, player, alpha=1):
         """
         Responsible for drawing everything onto screen.
+        If dirtyRects, only what changed since last frame is redrawn (see Renderer); otherwise the whole screen.
+        Optional 'alpha' is how far (0 to 1) frame is between last game iteration and the next: snakes are drawn
+        moving on from the cells they left (see Snake.getSprites). Frames are paced by caller (see loop.Timestep).
         """
-        # clear background
-        DISPLAYSURF.fill(BACKGROUNDCOLOR)
-
-        # check slow and adjust fps as needed
-        # draw grid to screen as well (color based on slow or normal)
-        if self.checkSlowTimer():
-            self.updateSlowTimer()
-            self.updateCurrentSpeed(FREEZING_POINT)
-            self.drawGrid(DARKBLUE)
+        if self.dirtyRects:
+            # a new game (grid) needs a new renderer
+            if self.renderer == False or self.renderer.grid is not self.grid:
+                self.renderer = Renderer(self.grid)
+            self.renderer.drawScreen(self, allfruit, allsnake, player, alpha)
         else:
-            self.updateCurrentSpeed()
-            self.drawGrid()
+            self.drawFullScreen(allfruit, allsnake, player, alpha)
+            pygame.display.update()
+
+    def drawFullScreen(self, allfruit, allsnake, player, alpha=1):
+        """
+        Draws everything onto screen (display is not updated).
+        """
+        self.drawBoard(allfruit, allsnake, alpha)
+            
+        # print scores only if snake is scored; if player is dead, print extra messages
+        for message in self.getMessages(allsnake, player):
+            drawMessage(*message)
+
+    def drawBoard(self, allfruit, allsnake, alpha=1):
+        """
+        Draws board (grid, fruit and snakes, alpha of a game iteration after they last moved) onto whole screen,
+        in one batch of images.
+        """
+        # clear background and draw grid to screen (color based on slow or normal)
+        blits = [(self.getBackground(self.getGridColor()), (0, 0))]
 
         # draw everything else to screen
         for fruit in allfruit:
-            fruit.drawFruit()
+            blits.append((fruit.getTile(), (fruit.coords['x'] * CELLSIZE, fruit.coords['y'] * CELLSIZE)))
         for snake in allsnake:
-            snake.drawSnake()
-            
-        # print scores only if snake is scored
+            tile = snake.getTile()
+            for cell in snake.getCells(alpha):
+                blits.append((tile, (getCellX(cell) * CELLSIZE, getCellY(cell) * CELLSIZE)))
+        for snake in allsnake:
+            blits.extend(snake.getSprites(alpha))
+        drawBlits(blits)
+
+    def getGridColor(self):
+        """
+        Returns color of grid: based on slow or normal.
+        """
+        if self.checkSlowTimer():
+            return DARKBLUE
+        return DARKGRAY
+
+    def getMessages(self, allsnake, player):
+        """
+        Returns list of messages drawn over board, as arguments of drawMessage (text, x, y[, color]):
+        score of every scored snake, and if player is dead, keys that can be pressed.
+        """
+        messages = []
         position = 1
         for snake in allsnake:
             if snake.scored == True:
-                snake.drawScore(position, allsnake)
+                messages.append(snake.getScoreMessage(position, allsnake))
                 position = position + 1
 
-        # if player is dead, print extra messages
         if player == False or player.alive == False:
             endMessage = 'press (e) to end game early'
             fastMessage = 'press (f) to fast-forward game'
             slowMessage = 'press (s) to slow game'
-            drawMessage(endMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 16)
-            drawMessage(fastMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 17)
-            drawMessage(slowMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 18)
-        pygame.display.update()
-        FPSCLOCK.tick(self.currentspeed)
+            turboMessage = 'press (t) for turbo'
+            if self.status != False:
+                turboMessage = self.status
+            messages.append((endMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 16))
+            messages.append((fastMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 17))
+            messages.append((slowMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 18))
+            messages.append((turboMessage, WINDOWWIDTH / 2, WINDOWHEIGHT / 20 * 19))
+        return messages
         
-    def drawGrid(self, color=DARKGRAY):
+    def getBackground(self, color=DARKGRAY):
         """
-        Draws grid to screen.
+        Returns surface of empty board with grid in color, the size of the screen.
+        Drawn on first use, then kept for every game (until size of screen changes).
         """
+        key = (DISPLAYSURF.get_size(), color)
+        if key not in BACKGROUNDS:
+            for oldKey in BACKGROUNDS.keys():
+                if oldKey[0] != key[0]:
+                    del BACKGROUNDS[oldKey]
+            background = pygame.Surface(DISPLAYSURF.get_size()).convert(DISPLAYSURF)
+            background.fill(BACKGROUNDCOLOR)
+            self.drawGrid(color, background)
+            BACKGROUNDS[key] = background
+        return BACKGROUNDS[key]
+
+    def drawGrid(self, color=DARKGRAY, surface=False):
+        """
+        Draws grid to screen (or to surface, if given).
+        """
+        if surface == False:
+            surface = DISPLAYSURF
         for x in range(0, WINDOWWIDTH, CELLSIZE): # draw vertical lines
-            pygame.draw.line(DISPLAYSURF, color, (x, TOP_BUFFER), (x, WINDOWHEIGHT))
+            pygame.draw.line(surface, color, (x, TOP_BUFFER), (x, WINDOWHEIGHT))
         for y in range(TOP_BUFFER, WINDOWHEIGHT, CELLSIZE): # draw horizontal lines
-            pygame.draw.line(DISPLAYSURF, color, (0, y), (WINDOWWIDTH, y))
+            pygame.draw.line(surface, color, (0, y), (WINDOWWIDTH, y))
+
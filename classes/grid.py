@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+
+import random
+from const import *
+
+
+# rows reserved for buffer (top of screen) are part of grid
+TOPROWS = TOP_BUFFER / CELLSIZE
+GRIDWIDTH = CELLWIDTH
+GRIDHEIGHT = CELLHEIGHT + TOPROWS
+
+# grid is padded by a border one cell wide, so a snake head that has gone out of bounds still has a cell
+STRIDE = GRIDWIDTH + 2
+GRIDSIZE = STRIDE * (GRIDHEIGHT + 2)
+
+# fruit is stored in grid as its index in FRUITTYPES plus one (0 is no fruit)
+FRUITTYPES = ['apple', 'poison', 'orange', 'raspberry', 'blueberry', 'lemon', 'egg']
+FRUITCODES = dict((name, index + 1) for index, name in enumerate(FRUITTYPES))
+
+
+# change in cell index when moving one cell in direction
+CELLSTEP = {UP: -STRIDE, DOWN: STRIDE, LEFT: -1, RIGHT: 1}
+
+
+def getCell(x, y):
+    """
+    Returns index of cell (x,y) in grid.
+    """
+    return (y + 1) * STRIDE + x + 1
+
+
+def getCellX(cell):
+    """
+    Returns x coordinate of cell index.
+    """
+    return cell % STRIDE - 1
+
+
+def getCellY(cell):
+    """
+    Returns y coordinate of cell index.
+    """
+    return cell / STRIDE - 1
+
+
+def getRegion(left, top, right, bottom):
+    """
+    Returns mask (bytearray over all cells) of cells within left..right and top..bottom (inclusive).
+    """
+    region = bytearray(GRIDSIZE)
+    for y in range(top, bottom + 1):
+        for x in range(left, right + 1):
+            region[getCell(x, y)] = 1
+    return region
+
+
+# mask of cells on board (including buffer, excluding border)
+BOARD = getRegion(0, 0, GRIDWIDTH - 1, GRIDHEIGHT - 1)
+# mask of cells on playing area (excluding buffer)
+PLAYFIELD = getRegion(0, TOPROWS, GRIDWIDTH - 1, GRIDHEIGHT - 1)
+
+
+class CellSet:
+    """
+    Set of cells with O(1) add, remove and random choice. Only cells within region (mask) are ever added.
+    cells - list of cells in set; removing a cell moves the last cell into its place.
+    index - position of each cell in cells, -1 if cell is not in set.
+    """
+    def __init__(self, region):
+        self.region = region
+        self.cells = []
+        self.index = [-1] * GRIDSIZE
+        for cell in range(GRIDSIZE):
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def add(self, cell):
+        """
+        Adds cell to set if in region and not already added.
+        """
+        if self.region[cell] and self.index[cell] < 0:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def remove(self, cell):
+        """
+        Removes cell from set if present, by swapping last cell into its place.
+        """
+        position = self.index[cell]
+        if position >= 0:
+            last = self.cells.pop()
+            if last != cell:
+                self.cells[position] = last
+                self.index[last] = position
+            self.index[cell] = -1
+
+    def choice(self, rng=random):
+        """
+        Returns random cell from set (drawn from rng), or False if set is empty.
+        """
+        if len(self.cells) == 0:
+            return False
+        return self.cells[rng.randint(0, len(self.cells) - 1)]
+
+    def sample(self, k, rng=random):
+        """
+        Returns list of k distinct random cells (drawn from rng) from set (fewer if set is smaller).
+        Partially shuffles cells in place, so costs O(k) regardless of size of set.
+        """
+        cells = self.cells
+        index = self.index
+        k = min(k, len(cells))
+        for i in range(k):
+            j = rng.randint(i, len(cells) - 1)
+            cells[i], cells[j] = cells[j], cells[i]
+            index[cells[i]] = i
+            index[cells[j]] = j
+        return cells[:k]
+
+
+class Grid:
+    """
+    Occupancy of every cell on the board, updated as snakes move and fruit is added or removed.
+    snake - number of snake segments in each cell (snakes may overlap when colliding).
+    fruit - code of fruit in each cell (see FRUITCODES), 0 if none.
+    free - cells on the playing area holding neither snake nor fruit, to place fruit in.
+    freeEasy - free cells away from edges (outside 20%), to place fruit in while in "easy mode".
+    watchers - objects told of every change to a cell, through their cellChanged(cell) method.
+    Can be read like the dictionary returned by getGrid used to be: grid[(x,y)] is 0, 'snake' or fruit name.
+    """
+    def __init__(self):
+        self.snake = bytearray(GRIDSIZE)
+        self.fruit = bytearray(GRIDSIZE)
+        self.free = CellSet(PLAYFIELD)
+        self.freeEasy = CellSet(getRegion(int(CELLWIDTH/5), TOPROWS + int(CELLHEIGHT/5),
+                                          CELLWIDTH - int(CELLWIDTH/5) - 1, GRIDHEIGHT - int(CELLHEIGHT/5) - 1))
+        self.watchers = []
+
+    def addSnake(self, cell):
+        """
+        Adds one snake segment to cell.
+        """
+        if self.snake[cell] == 0 and self.fruit[cell] == 0:
+            self.free.remove(cell)
+            self.freeEasy.remove(cell)
+        self.snake[cell] = self.snake[cell] + 1
+        self.notify(cell)
+
+    def removeSnake(self, cell):
+        """
+        Removes one snake segment from cell.
+        """
+        self.snake[cell] = self.snake[cell] - 1
+        if self.snake[cell] == 0 and self.fruit[cell] == 0:
+            self.free.add(cell)
+            self.freeEasy.add(cell)
+        self.notify(cell)
+
+    def addFruit(self, fruit):
+        """
+        Marks cell of fruit with its code.
+        """
+        cell = getCell(fruit.coords['x'], fruit.coords['y'])
+        if self.snake[cell] == 0 and self.fruit[cell] == 0:
+            self.free.remove(cell)
+            self.freeEasy.remove(cell)
+        self.fruit[cell] = FRUITCODES[fruit.name]
+        self.notify(cell)
+
+    def removeFruit(self, fruit):
+        """
+        Clears fruit from its cell.
+        """
+        cell = getCell(fruit.coords['x'], fruit.coords['y'])
+        self.fruit[cell] = 0
+        if self.snake[cell] == 0:
+            self.free.add(cell)
+            self.freeEasy.add(cell)
+        self.notify(cell)
+
+    def notify(self, cell):
+        """
+        Tells watchers that cell has changed.
+        """
+        for watcher in self.watchers:
+            watcher.cellChanged(cell)
+
+    def getFreeCell(self, rng=random, easy=False):
+        """
+        Returns random free cell, drawn from rng. If easy, it is chosen away from edges when possible.
+        Returns False if no cell is free.
+        """
+        if easy and len(self.freeEasy) > 0:
+            return self.freeEasy.choice(rng)
+        return self.free.choice(rng)
+
+    def getFreeCells(self, k, rng=random, easy=False):
+        """
+        Returns list of k distinct random free cells, drawn from rng (fewer if not enough cells are free).
+        If easy, cells are chosen away from edges, and only the rest from anywhere on board.
+        """
+        if easy == False:
+            return self.free.sample(k, rng)
+        cells = self.freeEasy.sample(k, rng)
+        if len(cells) < k:
+            # easy region is full -- all its free cells were taken, remaining cells come from whole board
+            taken = set(cells)
+            for cell in self.free.sample(k, rng):
+                if len(cells) == k:
+                    break
+                if cell not in taken:
+                    cells.append(cell)
+        return cells
+
+    def has_key(self, (x, y)):
+        """
+        Returns True if (x,y) is on board (including buffer).
+        """
+        return x >= 0 and x < GRIDWIDTH and y >= 0 and y < GRIDHEIGHT
+
+    def __getitem__(self, (x, y)):
+        """
+        Returns fruit name in cell (x,y), 'snake' if it holds a snake (but no fruit), otherwise 0.
+        """
+        if not self.has_key((x, y)):
+            raise KeyError((x, y))
+        cell = getCell(x, y)
+        if self.fruit[cell]:
+            return FRUITTYPES[self.fruit[cell] - 1]
+        elif self.snake[cell]:
+            return 'snake'
+        return 0
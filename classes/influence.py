@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+from const import *
+from grid import *
+
+# NumPy is optional -- without it, AIs look at the board themselves (see Opponent.look).
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# types of influence, in order of columns in InfluenceField.values
+FIELDTYPES = FRUITTYPES + ['snake']
+
+
+class InfluenceField:
+    """
+    Influence of every fruit type and of snakes on every cell of grid, updated once per game iteration and shared by all AIs.
+    Value of a type at a cell is the sum, over cells holding that type, of the square of depth minus (manhattan) distance,
+    where positive: its slope falls off with distance, so nearer cells pull harder (as in Opponent.look).
+    Only cells that changed since last update are applied (adding or removing their influence), so cost follows changes.
+    values - array of each type (see FIELDTYPES) for every cell of grid, padded by depth - 1 on each side.
+    Requires NumPy.
+    """
+    def __init__(self, depth=20):
+        self.depth = depth
+        self.radius = depth - 1
+        self.shape = (GRIDSIZE / STRIDE, STRIDE)
+        dy, dx = numpy.mgrid[-self.radius:self.radius + 1, -self.radius:self.radius + 1]
+        self.kernel = (numpy.maximum(0, depth - numpy.abs(dx) - numpy.abs(dy)) ** 2).astype(numpy.int32)
+        self.size = self.kernel.shape[0]
+        self.values = numpy.zeros((len(FIELDTYPES), self.shape[0] + 2 * self.radius,
+                                   self.shape[1] + 2 * self.radius), dtype=numpy.int32)
+        # cells holding each type, at last update and now
+        self.previous = numpy.zeros((len(FIELDTYPES),) + self.shape, dtype=bool)
+        self.planes = numpy.zeros((len(FIELDTYPES),) + self.shape, dtype=bool)
+
+    def update(self, grid):
+        """
+        Brings field up to date with grid.
+        """
+        fruit = numpy.frombuffer(grid.fruit, dtype=numpy.uint8).reshape(self.shape)
+        snake = numpy.frombuffer(grid.snake, dtype=numpy.uint8).reshape(self.shape)
+        for index in range(len(FRUITTYPES)):
+            numpy.equal(fruit, index + 1, out=self.planes[index])
+        numpy.greater(snake, 0, out=self.planes[len(FRUITTYPES)])
+
+        # add influence of cells that gained a type, remove it from cells that lost one
+        for t, y, x in zip(*numpy.nonzero(self.planes != self.previous)):
+            if self.planes[t, y, x]:
+                self.values[t, y:y + self.size, x:x + self.size] += self.kernel
+            else:
+                self.values[t, y:y + self.size, x:x + self.size] -= self.kernel
+        self.previous, self.planes = self.planes, self.previous
+
+    def getValues(self, cell):
+        """
+        Returns array of value of each type (see FIELDTYPES) at cell.
+        """
+        return self.values[:, cell / STRIDE + self.radius, cell % STRIDE + self.radius]
+
+    def getInfluence(self, cell, neighbor, weights):
+        """
+        Returns change in influence moving from cell to neighbor, each type weighted by weights (in order of FIELDTYPES).
+        Scaled by 2 * depth, so a step towards an adjacent cell counts about its weight (as in Opponent.look).
+        """
+        return int(numpy.dot(self.getValues(neighbor) - self.getValues(cell), weights) / (2.0 * self.depth))
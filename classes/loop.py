@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+import timeit
+from const import *
+
+
+# game iterations run for every one at game speed, in turn, as turbo is switched (spectating, key t);
+# False runs as many as fit in a frame.
+TURBO = [1, 10, 100, False]
+
+
+class Timestep:
+    """
+    Fixed-timestep clock: game iterations are run at game speed (currentspeed per second), however often frames are drawn.
+    Every frame, real time since the last frame is added to an accumulator; a game iteration is run for every 1/speed
+    seconds it holds, and what is left over (less than one game iteration) is how far the frame drawn is between
+    the last game iteration and the next (see getAlpha).
+    accumulator - seconds of real time not yet run as game iterations.
+    last - time (seconds) accumulator was last advanced.
+    maxsteps - most game iterations run in one frame: after a stall (window dragged, slow frame...) game time is
+               dropped rather than caught up in a burst.
+    turbo - game iterations run for every one at game speed (1, normally; see TURBO). False runs game iterations
+            until a frame's time (1/RENDER_FPS) is up, so only one game iteration in so many is drawn.
+    deadline - time frame's game iterations must be run by, in turbo (so frames are still drawn, and keys read,
+               when game iterations can not be run that fast).
+    """
+    def __init__(self, maxsteps=MAX_STEPS):
+        self.maxsteps = maxsteps
+        self.accumulator = 0.0
+        self.last = timeit.default_timer()
+        self.turbo = 1
+        self.deadline = self.last
+
+    def setTurbo(self, turbo):
+        """
+        Sets turbo (see TURBO), dropping game time owed.
+        """
+        self.turbo = turbo
+        self.accumulator = 0.0
+
+    def getTurboName(self):
+        """
+        Returns turbo as shown on screen ('x10', 'max'...).
+        """
+        if self.turbo == False:
+            return 'max'
+        return 'x' + str(self.turbo)
+
+    def start(self):
+        """
+        Starts counting real time from now, with no game time owed.
+        """
+        self.accumulator = 0.0
+        self.last = timeit.default_timer()
+
+    def advance(self, speed):
+        """
+        Adds real time since last advanced to accumulator, up to maxsteps game iterations at speed (times turbo).
+        """
+        now = timeit.default_timer()
+        self.deadline = now + 1.0 / RENDER_FPS
+        if self.turbo != False:
+            self.accumulator = min(self.accumulator + now - self.last, float(self.maxsteps) / speed)
+        self.last = now
+
+    def checkStep(self, speed):
+        """
+        Returns True (and takes one game iteration at speed out of accumulator) if a game iteration is due.
+        Speed is checked again for every game iteration, as game iterations change it.
+        """
+        if self.turbo != 1 and timeit.default_timer() >= self.deadline:
+            return False
+        if self.turbo == False:
+            return True
+        if self.accumulator >= 1.0 / speed / self.turbo:
+            self.accumulator = self.accumulator - 1.0 / speed / self.turbo
+            return True
+        return False
+
+    def getAlpha(self, speed):
+        """
+        Returns how far (0 to 1) real time is between the last game iteration run and the next, at speed.
+        Always 1 in turbo: snakes move too far between frames to be shown moving.
+        """
+        if self.turbo != 1:
+            return 1.0
+        return min(self.accumulator * speed, 1.0)
+
+
+class FrameBudget:
+    """
+    Skips drawing frames while frames take longer than their time (1/RENDER_FPS): a frame following one that overran
+    is not drawn, so its time goes to the game iterations due -- keeping game speed right, rather than falling behind
+    (and dropping game time, see Timestep) when drawing and game iterations can not both keep up.
+    At most maxskip frames are skipped in a row, so screen still moves.
+    maxskip - most frames skipped in a row (0 never skips).
+    skipped - frames skipped in a row so far.
+    overrun - if last frame took longer than its time.
+    """
+    def __init__(self, maxskip=MAX_SKIP):
+        self.maxskip = maxskip
+        self.skipped = 0
+        self.overrun = False
+
+    def checkDraw(self):
+        """
+        Returns True if frame is to be drawn, False if it is skipped.
+        """
+        if self.overrun and self.skipped < self.maxskip:
+            self.skipped = self.skipped + 1
+            return False
+        self.skipped = 0
+        return True
+
+    def update(self, frametime):
+        """
+        Records time (seconds) last frame took, not counting time spent waiting for the next.
+        """
+        self.overrun = frametime > 1.0 / RENDER_FPS
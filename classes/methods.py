@@ -1,7 +1,16 @@
+from collections import OrderedDict
 from const import *
 from fruit import *
 from button import *
 
+
+# fonts loaded, by size (see getFont)
+FONTS = {}
+# rendered text, least recently used first (see getText); kept below TEXTCACHEBYTES of pixel data in all
+TEXTCACHE = OrderedDict()
+TEXTCACHEBYTES = 16 * 1024 * 1024
+TEXTCACHESTATS = {'hits': 0, 'misses': 0, 'bytes': 0}
+
 def getPlayers(num=3):
     """
     Returns list containing Snakey and a number (only argument) of random snakes.
@@ -50,21 +59,24 @@ def showSelectPlayersScreen():
     
     DISPLAYSURF.fill(BACKGROUNDCOLOR)
 
+    redraw = True
     while True:
-        
-        drawTitle('Choose Match-up:')
-        drawTitle('Player 1:', WINDOWWIDTH / 3, WINDOWHEIGHT * 1/7, MEDIUMTITLE, GOLDENROD, True)
-        drawTitle('Player 2:', WINDOWWIDTH / 3 * 2, WINDOWHEIGHT * 1/7, MEDIUMTITLE, GOLDENROD, True)
-
-        # display all buttons
-        for button in playerbuttons:
-            button.display()
-        for button in opponentbuttons:
-            button.display()
-        cancelbutton.display()
-        acceptbutton.display()
-
-        for event in pygame.event.get():
+        if redraw:
+            drawTitle('Choose Match-up:')
+            drawTitle('Player 1:', WINDOWWIDTH / 3, WINDOWHEIGHT * 1/7, MEDIUMTITLE, GOLDENROD, True)
+            drawTitle('Player 2:', WINDOWWIDTH / 3 * 2, WINDOWHEIGHT * 1/7, MEDIUMTITLE, GOLDENROD, True)
+
+            # display all buttons
+            for button in playerbuttons:
+                button.display()
+            for button in opponentbuttons:
+                button.display()
+            cancelbutton.display()
+            acceptbutton.display()
+            pygame.display.update()
+
+        events = waitForEvents()
+        for event in events:
             if event.type == QUIT:
                 terminate()
             elif event.type == MOUSEBUTTONDOWN:
@@ -120,8 +132,7 @@ def showSelectPlayersScreen():
                     return False
                 elif event.key == K_ESCAPE or event.key == K_q:
                     terminate()
-
-        pygame.display.update()
+        redraw = checkForRedraw(events)
 
 
 def showSandboxScreen():
@@ -139,22 +150,24 @@ def showSandboxScreen():
     cancelbutton = Button('(e)xit', (WINDOWWIDTH * 1/3, WINDOWHEIGHT * 7/8))
     acceptbutton = Button('(s)tart', (WINDOWWIDTH * 2/3, WINDOWHEIGHT * 7/8))
 
+    redraw = True
     while True:
-    
-        DISPLAYSURF.fill(BACKGROUNDCOLOR)
-        
-        drawTitle('Sandbox Mode:')
-        drawTitle('Snakes:', WINDOWWIDTH * 1/3, WINDOWHEIGHT * 2/8, MEDIUMTITLE, GOLDENROD, True)
-        drawTitle('Starting FPS:', WINDOWWIDTH * 1/3, WINDOWHEIGHT * 3/8, MEDIUMTITLE, GOLDENROD, True)
-
-        # display all buttons
-        
-        snakesbutton.display()
-        fpsbutton.display()
-        cancelbutton.display()
-        acceptbutton.display()
-
-        for event in pygame.event.get():
+        if redraw:
+            DISPLAYSURF.fill(BACKGROUNDCOLOR)
+
+            drawTitle('Sandbox Mode:')
+            drawTitle('Snakes:', WINDOWWIDTH * 1/3, WINDOWHEIGHT * 2/8, MEDIUMTITLE, GOLDENROD, True)
+            drawTitle('Starting FPS:', WINDOWWIDTH * 1/3, WINDOWHEIGHT * 3/8, MEDIUMTITLE, GOLDENROD, True)
+
+            # display all buttons
+            snakesbutton.display()
+            fpsbutton.display()
+            cancelbutton.display()
+            acceptbutton.display()
+            pygame.display.update()
+
+        events = waitForEvents()
+        for event in events:
             if event.type == QUIT:
                 terminate()
             elif event.type == MOUSEBUTTONDOWN:
@@ -179,8 +192,7 @@ def showSandboxScreen():
                     return False
                 elif event.key == K_ESCAPE or event.key == K_q:
                     terminate()
-
-        pygame.display.update()
+        redraw = checkForRedraw(events)
 
 
 def showInstructScreen():
@@ -201,47 +213,50 @@ def showInstructScreen():
     
     page = 1
     
+    redraw = True
     while True:
-    
-        DISPLAYSURF.fill(BACKGROUNDCOLOR)
-
-        drawTitle('Snakey Party', WINDOWWIDTH / 2, WINDOWHEIGHT * 1/16, MEDIUMTITLE, GREEN, True)
-        drawTitle('Instructions', WINDOWWIDTH / 2, WINDOWHEIGHT * 3/16, MEDIUMTITLE, GREEN, True)
-        
-        if page == 1:
-            drawMessage('A variation on a classic game, Snakey Party is a', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
-            drawMessage('Snakey clone made with Pygame.', 5, WINDOWHEIGHT * 5/16, GOLDENROD)
-            drawMessage('Navigating Snakey with the arrow keys, avoid', 5, WINDOWHEIGHT * 6/16, GOLDENROD)
-            drawMessage('boundaries and other snakes while enjoying a', 5, WINDOWHEIGHT * 7/16, GOLDENROD)
-            drawMessage('buffet of tasty fruits!', 5, WINDOWHEIGHT * 8/16, GOLDENROD)
-        elif page == 2:
-            drawMessage('Fruits when eaten have different effects.', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
-            drawFruit(5, WINDOWHEIGHT * 5/16, RED)
-            drawMessage('Apple (10 points) When eaten will generate more', 55, WINDOWHEIGHT * 5/16, RED)
-            drawMessage('apples. They may also generate other fruits to appear.', 5, WINDOWHEIGHT * 6/16, RED)
-            drawFruit(5, WINDOWHEIGHT * 7/16, GREEN)
-            drawMessage('Poison (-25 points) Causes Snakey to shrink.', 55, WINDOWHEIGHT * 7/16, GREEN)
-            drawFruit(5, WINDOWHEIGHT * 8/16, ORANGE)
-            drawMessage('Orange (50 points) Worth lots of points, and will', 55, WINDOWHEIGHT * 8/16, ORANGE)
-            drawMessage('cause Snakey to grow!', 5, WINDOWHEIGHT * 9/16, ORANGE)
-            drawFruit(5, WINDOWHEIGHT * 10/16, PURPLE)
-            drawMessage('Raspberry  Will cause all fruit to be worth double', 55, WINDOWHEIGHT * 10/16, PURPLE)
-            drawMessage('for a short period of time (time stacks).', 5, WINDOWHEIGHT * 11/16, PURPLE)
-            drawFruit(5, WINDOWHEIGHT * 12/16, BLUE)
-            drawMessage('Blueberry (100 points) Slows everything down for a', 55, WINDOWHEIGHT * 12/16, BLUE)
-            drawMessage('short period of time (time stacks).', 5, WINDOWHEIGHT * 13/16, BLUE)
-        elif page == 3:
-            drawMessage('Modes.', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
-        elif page == 4:
-            drawMessage('AIs.', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
-
-        endbutton.display()
-        if page > 1:
-            prevbutton.display()
-        if page < 4:
-            nextbutton.display()
-
-        for event in pygame.event.get():
+        if redraw:
+            DISPLAYSURF.fill(BACKGROUNDCOLOR)
+
+            drawTitle('Snakey Party', WINDOWWIDTH / 2, WINDOWHEIGHT * 1/16, MEDIUMTITLE, GREEN, True)
+            drawTitle('Instructions', WINDOWWIDTH / 2, WINDOWHEIGHT * 3/16, MEDIUMTITLE, GREEN, True)
+
+            if page == 1:
+                drawMessage('A variation on a classic game, Snakey Party is a', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
+                drawMessage('Snakey clone made with Pygame.', 5, WINDOWHEIGHT * 5/16, GOLDENROD)
+                drawMessage('Navigating Snakey with the arrow keys, avoid', 5, WINDOWHEIGHT * 6/16, GOLDENROD)
+                drawMessage('boundaries and other snakes while enjoying a', 5, WINDOWHEIGHT * 7/16, GOLDENROD)
+                drawMessage('buffet of tasty fruits!', 5, WINDOWHEIGHT * 8/16, GOLDENROD)
+            elif page == 2:
+                drawMessage('Fruits when eaten have different effects.', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
+                drawFruit(5, WINDOWHEIGHT * 5/16, RED)
+                drawMessage('Apple (10 points) When eaten will generate more', 55, WINDOWHEIGHT * 5/16, RED)
+                drawMessage('apples. They may also generate other fruits to appear.', 5, WINDOWHEIGHT * 6/16, RED)
+                drawFruit(5, WINDOWHEIGHT * 7/16, GREEN)
+                drawMessage('Poison (-25 points) Causes Snakey to shrink.', 55, WINDOWHEIGHT * 7/16, GREEN)
+                drawFruit(5, WINDOWHEIGHT * 8/16, ORANGE)
+                drawMessage('Orange (50 points) Worth lots of points, and will', 55, WINDOWHEIGHT * 8/16, ORANGE)
+                drawMessage('cause Snakey to grow!', 5, WINDOWHEIGHT * 9/16, ORANGE)
+                drawFruit(5, WINDOWHEIGHT * 10/16, PURPLE)
+                drawMessage('Raspberry  Will cause all fruit to be worth double', 55, WINDOWHEIGHT * 10/16, PURPLE)
+                drawMessage('for a short period of time (time stacks).', 5, WINDOWHEIGHT * 11/16, PURPLE)
+                drawFruit(5, WINDOWHEIGHT * 12/16, BLUE)
+                drawMessage('Blueberry (100 points) Slows everything down for a', 55, WINDOWHEIGHT * 12/16, BLUE)
+                drawMessage('short period of time (time stacks).', 5, WINDOWHEIGHT * 13/16, BLUE)
+            elif page == 3:
+                drawMessage('Modes.', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
+            elif page == 4:
+                drawMessage('AIs.', 5, WINDOWHEIGHT * 4/16, GOLDENROD)
+
+            endbutton.display()
+            if page > 1:
+                prevbutton.display()
+            if page < 4:
+                nextbutton.display()
+            pygame.display.update()
+
+        events = waitForEvents()
+        for event in events:
             if event.type == QUIT:
                 terminate()
             elif event.type == MOUSEBUTTONDOWN:
@@ -263,8 +278,7 @@ def showInstructScreen():
                     page = page + 1
                 elif event.key == K_ESCAPE or event.key == K_q:
                     terminate()
-
-        pygame.display.update()
+        redraw = checkForRedraw(events)
 
 
 def terminate():
@@ -322,40 +336,6 @@ def showGameOverScreen():
     pygame.display.update()
 
 
-def getGrid(allsnake, allfruit):
-    """
-    Returns dictionary representation of all snakes and fruits on screen.
-    Coordinates are entered as tuple (x,y).
-    Used by AI when choosing best path.
-    """
-    # refresh grid, dictionary representation of playing board used by AI
-    grid = {(x,y):0 for x in range(CELLWIDTH) for y in range(CELLHEIGHT + (TOP_BUFFER / CELLSIZE))}
-    
-    # add snakes to grid
-    for snake in allsnake:
-        for snakebody in snake.coords:
-            grid[(snakebody['x'], snakebody['y'])] = 'snake'
-               
-     # add fruits to grid
-    for fruit in allfruit:
-        if fruit.__class__ == Apple:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'apple'
-        elif fruit.__class__ == Poison:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'poison'
-        elif fruit.__class__ == Orange:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'orange'
-        elif fruit.__class__ == Raspberry:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'raspberry'
-        elif fruit.__class__ == Blueberry:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'blueberry'
-        elif fruit.__class__ == Lemon:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'lemon'
-        elif fruit.__class__ == Egg:
-            grid[(fruit.coords['x'], fruit.coords['y'])] = 'egg'
-
-    return grid
-    
-    
 def drawMessage(text, x=1, y=1, color=MESSAGECOLOR, center=False):
     """
     Draws message to screen.
@@ -363,21 +343,26 @@ def drawMessage(text, x=1, y=1, color=MESSAGECOLOR, center=False):
     Set so that 640x480 -> 18 pts.
         800x600 -> 28 pts.
     """
+    messageSurf, messageRect = getMessage(text, x, y, color, center)
+    DISPLAYSURF.blit(messageSurf, messageRect)
+
+
+def getMessage(text, x=1, y=1, color=MESSAGECOLOR, center=False):
+    """
+    Returns message rendered (surface), and rectangle it is drawn to by drawMessage.
+    """
     size = int (WINDOWWIDTH * WINDOWHEIGHT / 17000)
-    font = pygame.font.Font('freesansbold.ttf', size)
-    messageSurf = font.render(text, True, color, BACKGROUNDCOLOR)
+    messageSurf = getText(text, size, color)
     messageRect = messageSurf.get_rect()
     if center == False:
         messageRect.topleft = (x, y)
     else:
         messageRect.center = (x, y)
-        
-    DISPLAYSURF.blit(messageSurf, messageRect)
+    return (messageSurf, messageRect)
     
     
 def drawTitle(text, x=1, y=1, size=MEDIUMTITLE, color=GREEN, center=False):
-    titleFont = pygame.font.Font('freesansbold.ttf', size)
-    titleSurf = titleFont.render(text, True, color, BACKGROUNDCOLOR)
+    titleSurf = getText(text, size, color)
     titleRect = titleSurf.get_rect()
     if center == False:
         titleRect.topleft = (x, y)
@@ -387,9 +372,64 @@ def drawTitle(text, x=1, y=1, size=MEDIUMTITLE, color=GREEN, center=False):
     DISPLAYSURF.blit(titleSurf, titleRect)
 
 
+def drawBlits(blits):
+    """
+    Draws list of (surface, position[, area]) onto screen, in order -- in one call, if pygame has Surface.blits.
+    """
+    if hasattr(DISPLAYSURF, 'blits'):
+        DISPLAYSURF.blits(blits, False)
+    else:
+        for blit in blits:
+            DISPLAYSURF.blit(*blit)
+
+
+def getFont(size):
+    """
+    Returns font of given size, loaded once.
+    """
+    if size not in FONTS:
+        FONTS[size] = pygame.font.Font('freesansbold.ttf', size)
+    return FONTS[size]
+
+
+def getText(text, size, color, background=BACKGROUNDCOLOR):
+    """
+    Returns surface of text rendered in font of size, color on background. Surface is shared -- it must not be drawn on.
+    Rendered text is kept, least recently used being dropped once it takes more than TEXTCACHEBYTES.
+    Hits and misses are counted in TEXTCACHESTATS.
+    """
+    key = (text, size, color, background)
+    if key in TEXTCACHE:
+        TEXTCACHESTATS['hits'] = TEXTCACHESTATS['hits'] + 1
+        surf = TEXTCACHE.pop(key)
+        TEXTCACHE[key] = surf
+        return surf
+
+    TEXTCACHESTATS['misses'] = TEXTCACHESTATS['misses'] + 1
+    surf = getFont(size).render(text, True, color, background)
+    TEXTCACHE[key] = surf
+    TEXTCACHESTATS['bytes'] = TEXTCACHESTATS['bytes'] + getSurfaceBytes(surf)
+    while TEXTCACHESTATS['bytes'] > TEXTCACHEBYTES and len(TEXTCACHE) > 1:
+        oldKey, oldSurf = TEXTCACHE.popitem(False)
+        TEXTCACHESTATS['bytes'] = TEXTCACHESTATS['bytes'] - getSurfaceBytes(oldSurf)
+    return surf
+
+
+def getSurfaceBytes(surf):
+    """
+    Returns size of pixel data of surface, in bytes.
+    """
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
 def debugPause():
     while True:
-        if checkForKeyPress():
+        event = pygame.event.wait()
+        if event.type == QUIT:
+            terminate()
+        elif event.type == KEYUP:
+            if event.key == K_ESCAPE or event.key == K_q:
+                terminate()
             return
             
             
@@ -413,14 +453,17 @@ def getPosition(position, allsnake, totalscored):
     
 
 def getStartCoords(pos=1):
+    # rows counted from top of playing area (below buffer)
+    top = (TOP_BUFFER / CELLSIZE) + 5
+    bottom = (TOP_BUFFER / CELLSIZE) + CELLHEIGHT - 5
     if pos == 1:
-        return [{'x':5, 'y':5},{'x':4, 'y':5},{'x':3, 'y':5}]
+        return [{'x':5, 'y':top},{'x':4, 'y':top},{'x':3, 'y':top}]
     elif pos == 2:
-        return [{'x':CELLWIDTH-5, 'y':CELLHEIGHT-5},{'x':CELLWIDTH-4, 'y':CELLHEIGHT-5},{'x':CELLWIDTH-3, 'y':CELLHEIGHT-5}]
+        return [{'x':CELLWIDTH-5, 'y':bottom},{'x':CELLWIDTH-4, 'y':bottom},{'x':CELLWIDTH-3, 'y':bottom}]
     elif pos == 3:
-        return [{'x':CELLWIDTH-5, 'y':5},{'x':CELLWIDTH-4, 'y':5},{'x':CELLWIDTH-3, 'y':5}]
+        return [{'x':CELLWIDTH-5, 'y':top},{'x':CELLWIDTH-4, 'y':top},{'x':CELLWIDTH-3, 'y':top}]
     elif pos == 4:
-        return [{'x':5, 'y':CELLHEIGHT-5},{'x':4, 'y':CELLHEIGHT-5},{'x':3, 'y':CELLHEIGHT-5}]
+        return [{'x':5, 'y':bottom},{'x':4, 'y':bottom},{'x':3, 'y':bottom}]
 
 
 def checkForKeyPress():
@@ -444,7 +487,7 @@ def waitForInput():
     Escapes/Quits as normal.
     """
     while True:
-        for event in pygame.event.get():
+        for event in waitForEvents():
             if event.type == QUIT:
                 terminate()
             elif event.type == KEYDOWN:
@@ -456,3 +499,20 @@ def waitForInput():
                 if pygame.mouse.get_pressed() != None:
                     return
 
+
+def waitForEvents():
+    """
+    Waits (asleep, rather than polling) for an event; returns it and any other events queued.
+    """
+    return [pygame.event.wait()] + pygame.event.get()
+
+
+def checkForRedraw(events):
+    """
+    Returns True if any of events may change what a menu screen shows (so it is drawn again);
+    mouse movement and releases of keys and buttons do not.
+    """
+    for event in events:
+        if event.type not in (MOUSEMOTION, MOUSEBUTTONUP, KEYUP):
+            return True
+    return False
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+import bisect, json, time, timeit
+
+
+# upper bounds (seconds) of histogram buckets; last bucket takes everything above
+BUCKETS = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25]
+
+
+class Histogram:
+    """
+    Distribution of durations of a phase, counted into BUCKETS.
+    counts - number of durations in each bucket (one more than BUCKETS, for durations above the last bound).
+    total - sum of all durations.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        """
+        Adds duration (seconds) to histogram.
+        """
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total = self.total + value
+
+    def getCount(self):
+        """
+        Returns number of durations added.
+        """
+        return sum(self.counts)
+
+
+class Metrics:
+    """
+    Optional timers (per phase of a game iteration or frame) and counters, shared by every game played.
+    Phases are timed by laps: start() marks beginning of a game iteration, lap(phase) times phase since the last mark.
+    histograms - dictionary of phase name to Histogram of its durations.
+    counters - dictionary of counter name to count.
+    last - time of last mark (see start/lap).
+    """
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.last = timeit.default_timer()
+
+    def start(self):
+        """
+        Marks beginning of timed phases.
+        """
+        self.last = timeit.default_timer()
+
+    def lap(self, phase):
+        """
+        Times phase (from last mark to now), then marks now.
+        """
+        now = timeit.default_timer()
+        self.observe(phase, now - self.last)
+        self.last = now
+
+    def observe(self, phase, value):
+        """
+        Adds duration (seconds) to histogram of phase.
+        """
+        if phase not in self.histograms:
+            self.histograms[phase] = Histogram()
+        self.histograms[phase].observe(value)
+
+    def count(self, name, value=1):
+        """
+        Adds value to counter.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def write(self, path):
+        """
+        Writes metrics to file: Prometheus text format (replacing file) if path ends with '.prom',
+        otherwise a line of JSON appended to file.
+        """
+        if path.endswith('.prom'):
+            f = open(path, 'w')
+            f.write(self.getPrometheus())
+        else:
+            f = open(path, 'a')
+            f.write(self.getJSON() + '\n')
+        f.close()
+
+    def getPrometheus(self):
+        """
+        Returns metrics in Prometheus text format: a histogram 'snakey_phase_seconds' (labelled by phase),
+        and a counter 'snakey_<name>_total' for each counter.
+        """
+        lines = ['# HELP snakey_phase_seconds Time spent in each phase of a game iteration or frame.',
+                 '# TYPE snakey_phase_seconds histogram']
+        for phase in sorted(self.histograms):
+            histogram = self.histograms[phase]
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ['+Inf'], histogram.counts):
+                cumulative = cumulative + count
+                lines.append('snakey_phase_seconds_bucket{phase="%s",le="%s"} %d' % (phase, bound, cumulative))
+            lines.append('snakey_phase_seconds_sum{phase="%s"} %.9f' % (phase, histogram.total))
+            lines.append('snakey_phase_seconds_count{phase="%s"} %d' % (phase, cumulative))
+        for name in sorted(self.counters):
+            lines.append('# TYPE snakey_%s_total counter' % name)
+            lines.append('snakey_%s_total %d' % (name, self.counters[name]))
+        return '\n'.join(lines) + '\n'
+
+    def getJSON(self):
+        """
+        Returns metrics as one line of JSON: time written, counters, and for each phase its buckets
+        (upper bounds, last is None for everything above), counts, sum and count.
+        """
+        phases = {}
+        for phase in self.histograms:
+            histogram = self.histograms[phase]
+            phases[phase] = {'buckets': BUCKETS + [None], 'counts': histogram.counts,
+                             'sum': histogram.total, 'count': histogram.getCount()}
+        return json.dumps({'time': time.time(), 'counters': self.counters, 'phases': phases}, sort_keys=True)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# Command line options of the scripts (benchmark.py, tournament.py, tune.py). Imports nothing of the game, as
+# scripts read their options before board size is set (when const is imported).
+
+import json, os
+
+
+def getOption(args, name, default):
+    """
+    Returns value following option name in args, default if it is not given.
+    """
+    if name in args:
+        return args[args.index(name) + 1]
+    return default
+
+
+def getOpponents(args):
+    """
+    Returns list of AIs described by every --opponent option (JSON, or a file of JSON).
+    """
+    opponents = []
+    for index, arg in enumerate(args[:-1]):
+        if arg == '--opponent':
+            value = args[index + 1]
+            if os.path.isfile(value):
+                f = open(value)
+                value = f.read()
+                f.close()
+            described = json.loads(value)
+            if isinstance(described, dict):
+                described = [described]
+            opponents.extend(described)
+    return opponents
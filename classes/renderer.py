@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+
+import pygame
+from const import *
+from methods import *
+from grid import *
+
+
+class Renderer:
+    """
+    Draws screen of a game, redrawing only what changed since last frame ("dirty rectangles"),
+    and updating display only where it was redrawn.
+    Every frame, cells that may look different (changed in grid, of snakes that changed color, holding fruit)
+    are compared with what was drawn in them; messages (scores...) are redrawn when their text changes.
+    Everything redrawn in a frame is drawn in one batch of images (background, tiles of snakes and fruit, messages).
+    Segments drawn between cells (see Snake.getSprites) are redrawn every frame, where they were and where they are.
+    grid - grid of game being drawn; renderer is told of every cell changed in it.
+    changed - cells changed in grid since last frame.
+    drawn - image (tile) drawn in each cell not showing empty board (see getCellKey).
+    colors - colors (border, inner) each snake was last drawn in.
+    messages - messages drawn over board last frame: list of (message, surface, rect) (see Game.getMessages).
+    gridColor - color grid was drawn in; False until first frame is drawn. Screen is redrawn whole when it changes.
+    sprites - rectangles of segments drawn between cells last frame.
+    heads - cells of snakes' heads last frame (a head is not drawn whole while it is moving into its cell).
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.changed = set()
+        self.drawn = {}
+        self.colors = {}
+        self.messages = []
+        self.gridColor = False
+        self.sprites = []
+        self.heads = set()
+        grid.watchers.append(self)
+
+    def cellChanged(self, cell):
+        """
+        Called by grid for every change to a cell.
+        """
+        self.changed.add(cell)
+
+    def drawScreen(self, game, allfruit, allsnake, player, alpha=1):
+        """
+        Draws changes since last frame onto screen, and updates display where they were drawn.
+        Snakes are drawn alpha (0 to 1) of a game iteration after they last moved.
+        """
+        gridColor = game.getGridColor()
+        messages = game.getMessages(allsnake, player)
+        fruitAt, snakeAt = self.getContents(allfruit, allsnake, alpha)
+        sprites = []
+        for snake in allsnake:
+            sprites.extend(snake.getSprites(alpha))
+        if gridColor != self.gridColor:
+            self.drawFullScreen(game, allfruit, allsnake, messages, fruitAt, snakeAt, alpha, sprites)
+            return
+
+        # cells that may look different: changed in grid, of snakes drawn in other colors, of fruit (eggs shrink),
+        # of heads (drawn whole once they stop moving)
+        cells = self.changed
+        self.changed = set()
+        cells.update(self.heads)
+        self.heads = self.getHeads(allsnake)
+        cells.update(self.heads)
+        for snake in allsnake:
+            colors = (snake.getColorBorderCurrent(), snake.getColorCurrent())
+            if self.colors.get(snake) != colors:
+                self.colors[snake] = colors
+                cells.update(snake.coords)
+        cells.update(fruitAt)
+
+        rects = []
+        for cell in cells:
+            key = self.getCellKey(cell, fruitAt, snakeAt)
+            if key != self.drawn.get(cell, False):
+                if key == False:
+                    del self.drawn[cell]
+                else:
+                    self.drawn[cell] = key
+                rects.append(self.getCellRect(cell))
+
+        # messages that changed are cleared and drawn again
+        previous = dict((message[0], message) for message in self.messages)
+        self.messages = []
+        for message in messages:
+            if message in previous:
+                self.messages.append(previous.pop(message))
+            else:
+                surf, rect = getMessage(*message)
+                self.messages.append((message, surf, rect))
+                rects.append(rect)
+        for message, surf, rect in previous.values():
+            rects.append(rect)
+
+        # segments between cells, where they were drawn last frame and where they are drawn now
+        rects.extend(self.sprites)
+        self.sprites = [rect for tile, rect in sprites]
+        rects.extend(self.sprites)
+
+        screen = DISPLAYSURF.get_rect()
+        rects = [rect.clip(screen) for rect in rects]
+        rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+        blits = []
+        for rect in rects:
+            blits.extend(self.getBlits(game, rect, fruitAt, snakeAt, sprites))
+        drawBlits(blits)
+        pygame.display.update(rects)
+
+    def drawFullScreen(self, game, allfruit, allsnake, messages, fruitAt, snakeAt, alpha=1, sprites=[]):
+        """
+        Draws whole screen (board, then messages) and updates whole display; remembers what was drawn.
+        """
+        game.drawBoard(allfruit, allsnake, alpha)
+        self.messages = []
+        for message in messages:
+            surf, rect = getMessage(*message)
+            DISPLAYSURF.blit(surf, rect)
+            self.messages.append((message, surf, rect))
+        for snake in allsnake:
+            self.colors[snake] = (snake.getColorBorderCurrent(), snake.getColorCurrent())
+        self.drawn = {}
+        for cell in fruitAt:
+            self.drawn[cell] = self.getCellKey(cell, fruitAt, snakeAt)
+        for cell in snakeAt:
+            self.drawn[cell] = self.getCellKey(cell, fruitAt, snakeAt)
+        self.sprites = [rect for tile, rect in sprites]
+        self.heads = self.getHeads(allsnake)
+        self.changed = set()
+        self.gridColor = game.getGridColor()
+        pygame.display.update()
+
+    def getContents(self, allfruit, allsnake, alpha=1):
+        """
+        Returns dictionaries of cell to fruit in it, and of cell to snake drawn whole on top in it (last in allsnake),
+        alpha of a game iteration after snakes last moved (see Snake.getCells).
+        """
+        fruitAt = {}
+        for fruit in allfruit:
+            fruitAt[getCell(fruit.coords['x'], fruit.coords['y'])] = fruit
+        snakeAt = {}
+        for snake in allsnake:
+            snakeAt.update(dict.fromkeys(snake.getCells(alpha), snake))
+        return (fruitAt, snakeAt)
+
+    def getHeads(self, allsnake):
+        """
+        Returns set of cells of snakes' heads.
+        """
+        return set([snake.coords[HEAD] for snake in allsnake if len(snake.coords) > 0])
+
+    def getCellKey(self, cell, fruitAt, snakeAt):
+        """
+        Returns what cell looks like: tile of snake on top (a segment covers whole cell), otherwise
+        tile of fruit in it. False if it shows empty board.
+        Tiles are shared by everything that looks the same, so cells look the same when their tiles are the same.
+        """
+        if cell in snakeAt:
+            return snakeAt[cell].getTile()
+        elif cell in fruitAt:
+            return fruitAt[cell].getTile()
+        return False
+
+    def getCellRect(self, cell):
+        """
+        Returns rectangle of screen cell is drawn to.
+        """
+        return pygame.Rect(getCellX(cell) * CELLSIZE, getCellY(cell) * CELLSIZE, CELLSIZE, CELLSIZE)
+
+    def getBlits(self, game, rect, fruitAt, snakeAt, sprites=[]):
+        """
+        Returns images (surface, position, area) redrawing area of screen (rect): empty board,
+        then tiles of fruit and snakes in cells crossing it, then segments between cells (sprites, list of
+        (tile, rect)) and messages over it -- each cut to rect.
+        """
+        blits = [(game.getBackground(self.gridColor), rect.topleft, rect)]
+        for y in range(max(rect.top / CELLSIZE, -1), min((rect.bottom - 1) / CELLSIZE, GRIDHEIGHT) + 1):
+            for x in range(max(rect.left / CELLSIZE, -1), min((rect.right - 1) / CELLSIZE, GRIDWIDTH) + 1):
+                cell = getCell(x, y)
+                if cell in snakeAt:
+                    tile = snakeAt[cell].getTile()
+                elif cell in fruitAt:
+                    tile = fruitAt[cell].getTile()
+                else:
+                    continue
+                blits.append(self.getClippedBlit(tile, self.getCellRect(cell), rect))
+        for tile, spriteRect in sprites:
+            if spriteRect.colliderect(rect):
+                blits.append(self.getClippedBlit(tile, spriteRect, rect))
+        for message, surf, messageRect in self.messages:
+            if messageRect.colliderect(rect):
+                blits.append(self.getClippedBlit(surf, messageRect, rect))
+        return blits
+
+    def getClippedBlit(self, surf, surfRect, rect):
+        """
+        Returns image (surface, position, area) drawing part of surf (drawn at surfRect) that is within rect.
+        """
+        area = surfRect.clip(rect)
+        return (surf, area.topleft, area.move(-surfRect.x, -surfRect.y))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+import json, struct
+
+
+# a replay file starts with MAGIC, then the length of its header (HEADERSIZE) and the header itself (JSON),
+# followed by records (RECORD): game iteration, code, value.
+MAGIC = 'SNKR'
+VERSION = 1
+HEADERSIZE = struct.Struct('<BH')
+RECORD = struct.Struct('<IBb')
+
+# record codes -- codes below SPEED are the index (in allsnake) of a snake steered by a player,
+# its value the new direction (index in DIRECTIONS).
+SPEED = 254  # value is change of base speed (player dead or spectating, keys f/s)
+END = 255    # last record: game ended (or was left) before this game iteration would have been run
+
+# directions as coded in records -- same as UP, DOWN, LEFT, RIGHT in const, which is not imported here:
+# replays are read before board size (set by const from arguments) is known.
+DIRECTIONS = ['up', 'down', 'left', 'right']
+
+
+class Recorder:
+    """
+    Records game run by a Simulation to a replay file, to be played back later (see Replay).
+    Only what the game can not reproduce from its seed is recorded -- changes of direction of snakes steered by players,
+    and changes of speed -- so a replay is a few KB however long the game is.
+    file - replay file being written; header is written when created.
+    directions - direction of each snake steered by a player (index in allsnake), as last recorded.
+    """
+    def __init__(self, path, sim, players, (width, height)):
+        self.file = open(path, 'wb')
+        header = json.dumps({'seed': sim.game.currentseed, 'settings': sim.game.settings,
+                             'players': players, 'width': width, 'height': height})
+        self.file.write(MAGIC + HEADERSIZE.pack(VERSION, len(header)) + header)
+        self.directions = {}
+        for index, snake in enumerate(sim.allsnake):
+            if snake.player:
+                self.directions[index] = snake.direction
+
+    def recordDirections(self, sim):
+        """
+        Records direction changes of snakes steered by players. Called before every game iteration is run.
+        """
+        for index in self.directions:
+            direction = sim.allsnake[index].direction
+            if direction != self.directions[index]:
+                self.file.write(RECORD.pack(sim.tick, index, DIRECTIONS.index(direction)))
+                self.directions[index] = direction
+
+    def recordSpeed(self, sim, value):
+        """
+        Records change of base speed by value (see Game.updateBaseSpeed).
+        """
+        self.file.write(RECORD.pack(sim.tick, SPEED, value))
+
+    def close(self, sim):
+        """
+        Records end of game (and direction changes since last recorded) and closes file.
+        Step that ended game does not count as a game iteration (see Simulation.step), but is part of the recording.
+        """
+        self.recordDirections(sim)
+        if sim.gameover:
+            self.file.write(RECORD.pack(sim.tick + 1, END, 0))
+        else:
+            self.file.write(RECORD.pack(sim.tick, END, 0))
+        self.file.close()
+
+
+class Replay:
+    """
+    Replay file read back, to rebuild the game it was recorded from.
+    seed, settings, players - seed, Game keyword arguments and players of game recorded.
+    width, height - window size game was recorded at (board size depends on it).
+    events - dictionary of game iteration to list of (code, value) records, in order recorded.
+    length - number of game iterations recorded, False if recording was not closed (game was quit).
+    """
+    def __init__(self, path):
+        f = open(path, 'rb')
+        data = f.read()
+        f.close()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError('%s is not a replay file.' % path)
+        offset = len(MAGIC)
+        version, size = HEADERSIZE.unpack_from(data, offset)
+        if version != VERSION:
+            raise ValueError('%s has unsupported replay version %d.' % (path, version))
+        offset = offset + HEADERSIZE.size
+        header = json.loads(data[offset:offset + size])
+        offset = offset + size
+
+        self.seed = header['seed']
+        self.settings = dict((str(key), value) for key, value in header['settings'].items())
+        self.players = [str(name) for name in header['players']]
+        self.width = header['width']
+        self.height = header['height']
+        self.events = {}
+        self.length = False
+        while offset + RECORD.size <= len(data):
+            tick, code, value = RECORD.unpack_from(data, offset)
+            offset = offset + RECORD.size
+            if code == END:
+                self.length = tick
+                break
+            self.events.setdefault(tick, []).append((code, value))
+
+    def getGameSettings(self):
+        """
+        Returns Game keyword arguments that reproduce game recorded.
+        """
+        settings = dict(self.settings)
+        settings['seed'] = self.seed
+        return settings
+
+    def applyEvents(self, sim):
+        """
+        Applies records of next game iteration of sim, as rungame did: turns snakes steered by players, changes speed of game.
+        """
+        for code, value in self.events.get(sim.tick, []):
+            if code == SPEED:
+                sim.game.updateBaseSpeed(value)
+                sim.game.updateCurrentSpeed(False, True)
+            else:
+                sim.allsnake[code].direction = DIRECTIONS[value]
+
+    def isOver(self, sim):
+        """
+        Returns True once sim has run as many game iterations as were recorded.
+        Records of last game iteration (made before game was left) should be applied first.
+        """
+        return self.length is not False and sim.tick >= self.length
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+
+import random
+from const import *
+from methods import *
+from fruit import *
+from game import Game
+from grid import *
+import influence
+import distance
+
+
+# direction a snake can never turn to, given its current direction
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+# built-in AIs: name to (color, border color, randomness, preferSameDirection, avoidSnake, goal) (see Opponent)
+PERSONALITIES = {LINUS: (IVORY, DARKGRAY, 5, 20, -10, [50, -10, 30, 20, 35, 100, 30]),
+                 WIGGLES: (SLATEBLUE, COBALTGREEN, 15, 5, -5, [60, -10, 40, 10, 25, 100, 5]),
+                 GOOBER: (PINK, RED, 10, 10, -15, [30, 5, 60, 30, 35, 100, 100])}
+
+
+class Simulation:
+    """
+    Runs the rules of a game, one game iteration per step(). Needs no display or clock.
+    game - Game instance holding the settings of the mode being played.
+    allsnake - list of all snakes, in order of players given (hatched snakes are appended).
+    allfruit - list of all fruit on the board.
+    grid - occupancy grid of the board, updated as snakes move and fruit comes and goes (shared with game).
+    field - shared by AIs: InfluenceField if game's perception is 'field' (and NumPy is installed),
+            DistanceMaps if it is 'distance'; otherwise False.
+    player - Snake controlled by the player, False if there is none.
+    tick - number of game iterations run.
+    gameover - set once no scored snake is alive.
+    metrics - Metrics timing each phase of step() and counting its work, False (default) to not measure.
+    """
+    def __init__(self, game, players=[], metrics=False):
+        self.game = game
+        # every game run starts from the same state, with a new random number generator (see Game.reset)
+        self.game.reset()
+        self.allsnake = []
+        self.allfruit = []
+        self.grid = Grid()
+        self.game.grid = self.grid
+        self.field = False
+        if self.game.perception == 'field' and influence.numpy != None:
+            self.field = influence.InfluenceField()
+        elif self.game.perception == 'distance':
+            self.field = distance.DistanceMaps(self.grid)
+        self.player = False
+        self.tick = 0
+        self.gameover = False
+        self.metrics = metrics
+
+        # create snakes based on name
+        pos = 1
+        for name in players:
+            snake = self.createSnake(name, pos)
+            if snake != False:
+                if snake.player and self.player == False:
+                    self.player = snake
+                self.game.addSnake(snake, self.allsnake)
+                pos = pos + 1
+
+        # create initial apple(s)
+        appleCounter = self.game.apples
+        while appleCounter > 0:
+            a = Apple(self.allfruit, self.allsnake, self.game)
+            self.game.addFruit(a, self.allfruit)
+            appleCounter = appleCounter - 1
+
+    def createSnake(self, name, pos):
+        """
+        Returns snake (player or AI) for given name, at starting position pos.
+        Name may also be a dictionary describing an AI (see createOpponent).
+        Returns False if name is not recognized.
+        """
+        if isinstance(name, dict):
+            return self.createOpponent(name, pos)
+        if name == SNAKEY:
+            return Snake(SNAKEY, getStartCoords(pos))
+        elif name in PERSONALITIES:
+            color, colorBorder, randomness, preferSameDirection, avoidSnake, goal = PERSONALITIES[name]
+            return Opponent(name, getStartCoords(pos), color, colorBorder, randomness, preferSameDirection, avoidSnake,
+                            goal)
+        return False
+
+    def createOpponent(self, spec, pos):
+        """
+        Returns AI at starting position pos, with personality given as a dictionary: 'name', and optionally
+        'randomness', 'preferSameDirection', 'avoidSnake' and 'goal' (dictionary of fruit name to how much AI
+        goes for it). Values not given are those of Opponent.
+        """
+        goal = dict(zip(GOALFRUIT, [50, -10, 30, 20, 35, 100, 30]))
+        goal.update(spec.get('goal', {}))
+        return Opponent(str(spec['name']), getStartCoords(pos), COBALTGREEN, GOLDENROD, spec.get('randomness', 20),
+                        spec.get('preferSameDirection', 10), spec.get('avoidSnake', -15),
+                        [goal[fruit] for fruit in GOALFRUIT])
+
+    def step(self, actions={}):
+        """
+        Runs one game iteration and returns True if game is over afterwards.
+        State is not built every game iteration, as most callers never read it: call getState for it.
+        Argument (actions) is a dictionary of snake index (in allsnake) to direction.
+        Snakes given an action turn that way (unless it reverses them); AIs not given one choose their own.
+        """
+        if self.gameover:
+            return True
+
+        game = self.game
+        allsnake = self.allsnake
+        allfruit = self.allfruit
+        metrics = self.metrics
+        if metrics:
+            metrics.start()
+            fruitCount = len(allfruit)
+            fruitRemoved = 0
+
+        # apply direction choices
+        for index in actions:
+            snake = allsnake[index]
+            if snake.alive and actions[index] != OPPOSITE[snake.direction]:
+                snake.direction = actions[index]
+        if metrics:
+            metrics.lap('actions')
+
+        # update all other snake's direction choice
+        if self.field:
+            self.field.update(self.grid)
+            if metrics:
+                metrics.lap('field')
+        for index, snake in enumerate(allsnake):
+            if snake.alive and snake.player == False and index not in actions:
+                snake.updateDirection(self.grid, self.field, game.random)
+                if metrics:
+                    metrics.count('ai_calls')
+        if metrics:
+            metrics.lap('ai')
+
+        # collision detection -- boundary, or any snake (self, others, head-to-head) found in grid cell of head
+        if metrics:
+            metrics.count('collisions_checked', len([snake for snake in allsnake if snake.alive]))
+        for snake in allsnake:
+            if snake.alive and (snake.boundsCollision() or snake.gridCollision(self.grid)):
+                snake.alive = False
+        if metrics:
+            metrics.lap('collision')
+
+        # check if fruit has been eaten by a snake -- fruit in grid cell of head (one fruit per cell)
+        for snake in allsnake:
+            if snake.alive and len(snake.coords) > 0 and self.grid.fruit[snake.coords[HEAD]]:
+                fruit = game.fruitAt[snake.coords[HEAD]]
+                fruit.isEaten(snake, game)
+                # apples have special adding properties
+                if fruit.__class__ == Apple:
+                    # check for speed increase
+                    if game.checkSpeedTrigger():
+                        game.updateBaseSpeed(1)
+                    # check for fruit bonus drop
+                    if game.checkBonusTrigger():
+                        game.runBonusFruit(allfruit, allsnake)
+                    # run usual fruit drop
+                    game.runDrop(allfruit, allsnake)
+                # blueberries have special speed adjusting properties
+                elif fruit.__class__ == Blueberry:
+                    # update game frames to be 'slow' by 7 seconds
+                    game.slowtimer = game.slowtimer + game.currentspeed * 7
+                # remove fruit
+                game.removeFruit(fruit, allfruit)
+                if metrics:
+                    metrics.count('fruit_eaten')
+                    fruitRemoved = fruitRemoved + 1
+        if metrics:
+            metrics.lap('fruit')
+
+        # check for snake death, update place and end game if no more snakes are alive
+        if game.checkSnakeDeath(allsnake):
+            self.gameover = True
+            return True
+
+        # check for size changes / move snake
+        for snake in allsnake:
+            snake.move(game.trailing, self.grid)
+        if metrics:
+            metrics.lap('move')
+
+        # check multiplier and adjust color and multiplier as needed
+        for snake in allsnake:
+            if snake.multipliertimer > 0:
+                snake.multipliertimer = snake.multipliertimer - 1
+                snake.setColorBorderCurrent(PURPLE)
+            else:
+                # make sure multiplier is 1, color is normal
+                snake.multiplier = 1
+                snake.resetColorBorder()
+        if metrics:
+            metrics.lap('multiplier')
+
+        # update timers on fruits, remove if necessary
+        for fruit in allfruit[:]:
+            if fruit.__class__ != Apple:
+                if fruit.updateTimer() == False:
+                    # if timer on Egg expires, hatch new snake
+                    if fruit.__class__ == Egg:
+                        fruit.isHatched(allsnake, game)
+                    game.removeFruit(fruit, allfruit)
+                    if metrics:
+                        fruitRemoved = fruitRemoved + 1
+
+        # slow down / speed up game
+        game.updateSpeed()
+        if metrics:
+            metrics.lap('timers')
+            metrics.count('ticks')
+            metrics.count('fruit_spawned', len(allfruit) - fruitCount + fruitRemoved)
+
+        self.tick = self.tick + 1
+        return False
+
+    def getState(self):
+        """
+        Returns dictionary representation of the game.
+        'snakes' is a list (same order as allsnake) of dictionaries; 'fruit' is a list of dictionaries.
+        Coordinates are copied, so state is not changed by later game iterations.
+        """
+        snakes = []
+        for snake in self.allsnake:
+            snakes.append({'name': snake.name, 'alive': snake.alive, 'scored': snake.scored,
+                           'direction': snake.direction, 'score': snake.score, 'place': snake.place,
+                           'coords': snake.getBody()})
+        fruits = []
+        for fruit in self.allfruit:
+            fruits.append({'type': fruit.name,
+                           'x': fruit.coords['x'], 'y': fruit.coords['y']})
+        return {'tick': self.tick, 'gameover': self.gameover, 'speed': self.game.currentspeed,
+                'snakes': snakes, 'fruit': fruits}
+
+    def run(self, maxticks=False):
+        """
+        Steps simulation (AIs only, player keeps direction) until game is over or maxticks iterations are run.
+        Returns number of game iterations run.
+        """
+        start = self.tick
+        while self.gameover == False:
+            if maxticks != False and self.tick - start >= maxticks:
+                break
+            self.step()
+        return self.tick - start
@@ -1,18 +1,44 @@
 #!/usr/bin/env python
 
 import random, pygame, sys
+from array import array
+from collections import deque
+from itertools import islice
 from pygame.locals import *
 from const import *
+from grid import *
 import methods
 
 
+# images of one snake segment, by (border color, color) -- shared by all snakes (see getSegmentTile)
+SEGMENTTILES = {}
+# number of images kept; all are dropped when reached (colors of snakes keep changing as they eat)
+TILESMAX = 1024
+
+
+def getSegmentTile(colorBorder, color):
+    """
+    Returns image (CELLSIZE square) of a snake segment in given colors (tuples), drawn on first use.
+    """
+    key = (colorBorder, color)
+    if key not in SEGMENTTILES:
+        if len(SEGMENTTILES) >= TILESMAX:
+            SEGMENTTILES.clear()
+        tile = pygame.Surface((CELLSIZE, CELLSIZE)).convert(DISPLAYSURF)
+        pygame.draw.rect(tile, colorBorder, pygame.Rect(0, 0, CELLSIZE, CELLSIZE))
+        pygame.draw.rect(tile, color, pygame.Rect(3, 3, CELLSIZE - 6, CELLSIZE - 6))
+        SEGMENTTILES[key] = tile
+    return SEGMENTTILES[key]
+
+
 class Snake:
     """
     Snake class houses all information for a particular snake.
     player - if snake is the player.
     name - name of snake.
     alive - if snake is alive. Rather than delete, this allows snake to slowly shrink to the point of where it died.
-    coords - a list of dictionaries containing coordinates 'x' and 'y'. A special global variable HEAD (0).
+    coords - a deque of cells (see grid.getCell), head first. A special global variable HEAD (0).
+             Given as a list of dictionaries containing coordinates 'x' and 'y' when created.
     direction - where snake moves for every game iteration ('left', 'up', etc).
     color - body of snake's color.
     colorBorder - outline of body.
@@ -21,6 +47,10 @@ class Snake:
     multipliertimer - number of game iterations multiplier stays in effect.
     score - the number of points snake has accumulated.
     place - used to determine death order.
+    tile - image of a segment in current colors (see getTile); tileColors - colors it was drawn in.
+    moved - cells left by last move: (head, tail) before it -- tail False if it did not move one cell
+            (snake grew or shrank) -- or False if snake did not move. Frames drawn between game iterations
+            show head and tail moving on from them (see getSprites).
     """
     def __init__(self, n=SNAKEY, c=False, colorsnake=GREEN, colorborder=COBALTGREEN):
         self.name = n
@@ -31,13 +61,12 @@ class Snake:
         self.alive = True
         
         if c == False:
-            self.coords = getStartCoords(1)
-        else:
-            self.coords = c
+            c = methods.getStartCoords(1)
+        self.coords = deque([getCell(coord['x'], coord['y']) for coord in c])
         
         # determine direction if length supports
-        if len(self.coords) > 1:
-            if self.coords[0]['x'] > self.coords[1]['x']:
+        if len(c) > 1:
+            if c[0]['x'] > c[1]['x']:
                 self.direction = RIGHT
             else:
                 self.direction = LEFT
@@ -52,6 +81,9 @@ class Snake:
         self.colorBorder = {'red': 0, 'green': 0, 'blue': 0}
         self.updateColorBorder({'red': colorborder[0], 'green': colorborder[1], 'blue': colorborder[2]})
         self.colorBorderCurrent = self.colorBorder
+        self.tile = False
+        self.tileColors = False
+        self.moved = False
         
         self.growth = 0
         self.multiplier = 1
@@ -206,7 +238,7 @@ class Snake:
         Will always return False if coordinates < 1.
         """
         if len(self.coords) > 0:
-            if self.coords[HEAD]['x'] == x and self.coords[HEAD]['y'] == y:
+            if self.coords[HEAD] == getCell(x, y):
                 return True
         return False
         
@@ -216,7 +248,15 @@ class Snake:
         Will always return False if coordinates < 1.
         """
         if len(self.coords) > 0:
-            return self.coords[HEAD][axis]
+            if axis == 'x':
+                return getCellX(self.coords[HEAD])
+            return getCellY(self.coords[HEAD])
+
+    def getBody(self):
+        """
+        Returns list of dictionaries containing coordinates 'x' and 'y' of every segment, head first.
+        """
+        return [{'x': getCellX(cell), 'y': getCellY(cell)} for cell in self.coords]
 
     def boundsCollision(self):
         """
@@ -239,87 +279,141 @@ class Snake:
         if len(self.coords) > 0 and len(snake.coords) > 0:
             if self is snake:
                 # exclude head if checked against self
-                for snakebody in snake.coords[1:]:
-                    if snakebody['x'] == self.coords[HEAD]['x'] and \
-                       snakebody['y'] == self.coords[HEAD]['y']:
-                        return True    
-            else:
-                for snakebody in snake.coords:
-                    if snakebody['x'] == self.coords[HEAD]['x'] and \
-                       snakebody['y'] == self.coords[HEAD]['y']:
-                        return True
+                if snake.coords.count(self.coords[HEAD]) > 1:
+                    return True
+            elif self.coords[HEAD] in snake.coords:
+                return True
         # no collision
         return False
         
+    def gridCollision(self, grid):
+        """
+        This returns True if snake (head) shares its cell with any other snake segment (its own or another snake's).
+        Same result as checking snakeCollision against every snake, using counts kept in grid.
+        """
+        if len(self.coords) > 0:
+            return grid.snake[self.coords[HEAD]] > 1
+        return False
+
     def fruitCollision(self, fruit):
         """
         This returns True if snake (head) has collided with a given fruit.
         """
-        if self.getCoords('x') == fruit.coords['x'] and \
-           self.getCoords('y') == fruit.coords['y']:
+        if len(self.coords) > 0 and \
+           self.coords[HEAD] == getCell(fruit.coords['x'], fruit.coords['y']):
             return True
         else:
             return False
 
-    def move(self, trailing=False):
+    def move(self, trailing=False, grid=False):
         """
         This will update coords for snake, moving it one cell in given direction.
         It also factors in and updates growth if any growth is "owed" snake (one per game iteration).
         If snake is dead, will only remove the last segment of snake and ignore direction / not move snake.
+        Optional 'grid' is kept up to date with segments added and removed.
         """
+        self.moved = False
         if self.alive:
+            head = self.coords[HEAD]
+            tail = self.coords[-1]
+            length = len(self.coords)
+
             # delete last segment first.
             if self.growth < 0:
                 self.growth = self.growth + 1
                 if len(self.coords) > 3:
                     # implement negative growth by removing last two segments
-                    del self.coords[-2:]
+                    self.removeTail(grid)
+                    self.removeTail(grid)
                 else:
                     # snake is too short -- remove last segment as normal
-                    del self.coords[-1]
+                    self.removeTail(grid)
             elif self.growth > 0:
                 # implement positive growth by not deleting last segment
                 self.growth = self.growth - 1
             elif trailing == False:
                 # no growth factor, delete last segment if trailing is off
-                del self.coords[-1]
-
-            # determine new head coordinates by direction
-            if self.direction == UP:
-                newhead = {'x': self.getCoords('x'), 
-                           'y': self.getCoords('y') - 1}
-            elif self.direction == DOWN:
-                newhead = {'x': self.getCoords('x'), 
-                           'y': self.getCoords('y') + 1}
-            elif self.direction == LEFT:
-                newhead = {'x': self.getCoords('x') - 1, 
-                           'y': self.getCoords('y')}
-            elif self.direction == RIGHT:
-                newhead = {'x': self.getCoords('x') + 1, 
-                           'y': self.getCoords('y')}
+                self.removeTail(grid)
+
+            # determine new head cell by direction
+            newhead = self.coords[HEAD] + CELLSTEP[self.direction]
 
             # insert new head segment
-            self.coords.insert(HEAD, newhead)
+            self.coords.appendleft(newhead)
+            if grid:
+                grid.addSnake(newhead)
+
+            # tail moved one cell only if one segment was removed
+            if len(self.coords) == length:
+                self.moved = (head, tail)
+            else:
+                self.moved = (head, False)
 
         # dead snake -- remove last segment
         elif len(self.coords) > 0:
-            del self.coords[-1]
+            self.removeTail(grid)
+
+    def removeTail(self, grid=False):
+        """
+        Removes last segment of snake (from grid as well, if given).
+        """
+        tail = self.coords.pop()
+        if grid:
+            grid.removeSnake(tail)
             
+    def getTile(self):
+        """
+        Returns image of one segment of snake, in its current colors.
+        Image is looked up again only when colors change (updateColor, setColorBorderCurrent, resetColor...).
+        """
+        colors = (self.getColorBorderCurrent(), self.getColorCurrent())
+        if colors != self.tileColors:
+            self.tileColors = colors
+            self.tile = getSegmentTile(colors[0], colors[1])
+        return self.tile
+
+    def getCells(self, alpha=1):
+        """
+        Returns cells drawn whole, a fraction alpha (0 to 1) of a game iteration after snake last moved:
+        every cell of snake, but head while it is still moving into its cell (see getSprites).
+        """
+        if alpha < 1 and self.moved != False:
+            return islice(self.coords, 1, None)
+        return self.coords
+
+    def getSprites(self, alpha=1):
+        """
+        Returns segments drawn between cells, a fraction alpha (0 to 1) of a game iteration after snake last moved:
+        list of (tile, rect) -- head moving into its cell, and tail moving out of the cell it left.
+        Empty once alpha reaches 1, or if snake did not move.
+        """
+        if alpha >= 1 or self.moved == False:
+            return []
+        tile = self.getTile()
+        sprites = []
+        for start, end in [(self.moved[0], self.coords[HEAD]), (self.moved[1], self.coords[-1])]:
+            if start is not False:
+                x = getCellX(start) + (getCellX(end) - getCellX(start)) * alpha
+                y = getCellY(start) + (getCellY(end) - getCellY(start)) * alpha
+                sprites.append((tile, pygame.Rect(int(round(x * CELLSIZE)), int(round(y * CELLSIZE)), CELLSIZE, CELLSIZE)))
+        return sprites
+
     def drawSnake(self):
         """
-        Responsible for drawing snake image to screen.
+        Responsible for drawing snake image to screen: every segment in one batch.
         """
-        for coord in self.coords:
-            x = coord['x'] * CELLSIZE
-            y = coord['y'] * CELLSIZE
-            snakeSegmentRect = pygame.Rect(x, y, CELLSIZE, CELLSIZE)
-            pygame.draw.rect(DISPLAYSURF, self.getColorBorderCurrent(), snakeSegmentRect)
-            snakeInnerSegmentRect = pygame.Rect(x + 3, y + 3, CELLSIZE - 6, CELLSIZE - 6)
-            pygame.draw.rect(DISPLAYSURF, self.getColorCurrent(), snakeInnerSegmentRect)
+        tile = self.getTile()
+        methods.drawBlits([(tile, (getCellX(cell) * CELLSIZE, getCellY(cell) * CELLSIZE)) for cell in self.coords])
             
     def drawScore(self, position, allsnake):
         """
         Responsible for drawing snake score to screen.
+        """
+        methods.drawMessage(*self.getScoreMessage(position, allsnake))
+
+    def getScoreMessage(self, position, allsnake):
+        """
+        Returns arguments of drawMessage (text, x, y, color) to draw snake score with.
         Coordinates of where drawn so that 'y' depends on number of snakes being scored, 'x' at the top (where buffer is)
         """
         # get number of snakes in allsnake that will be scored.
@@ -327,9 +421,12 @@ class Snake:
         for snake in allsnake:
             if snake.scored == True:
                 totalscored = totalscored + 1
-        methods.drawMessage(self.name + ': ' + str(self.score), \
-                            methods.getPosition(position, allsnake, totalscored), \
-                            1, self.getColorCurrent())
+        return (self.name + ': ' + str(self.score), methods.getPosition(position, allsnake, totalscored),
+                1, self.getColorCurrent())
+
+
+# fruit an Opponent's goal weighs, in order of the goal list it is created with
+GOALFRUIT = ['apple', 'poison', 'orange', 'raspberry', 'blueberry', 'lemon', 'egg']
 
 
 class Opponent(Snake):
@@ -343,15 +440,19 @@ class Opponent(Snake):
         self.randomness = r
         self.preferSameDirection = p
         self.avoidSnake = a
-        self.goal = {'apple': g[0], 'poison': g[1], 'orange': g[2], 'raspberry': g[3], 'blueberry': g[4], 'lemon': g[5], 'egg': g[6]}
+        self.goal = dict(zip(GOALFRUIT, g))
+        # cells looked at are stamped with number of current look, so buffer never needs clearing
+        self.visited = array('I', [0]) * GRIDSIZE
+        self.lookCount = 0
 
-    def updateDirection(self, grid):
+    def updateDirection(self, grid, field=False, rng=random):
         """
         Responsible for determining opponent's direction choice.
-        Takes one argument - grid representation of playing board. Copied and marked as cells are 'explored'
-        Neighboring 
+        Takes grid representation of playing board. Cells 'explored' are recorded in visited (grid is not changed).
+        Optional 'field' (InfluenceField or DistanceMaps shared by all AIs) is used instead of looking at board.
+        Randomness is drawn from rng (game's random number generator).
         """
-        # copy grid to snake -- this will allow cells already searched to be marked 'visited'
+        # grid is only read -- cells already searched are kept in visited
         self.grid = grid
     
         # all directions have value adjusted -- reset
@@ -396,11 +497,14 @@ class Opponent(Snake):
             self.nextDirection[DOWN] = self.nextDirection[DOWN] - 1000
             
         # 'look' to neighboring squares for possible snakes and fruits
-        self.look(x, y, self.depthPerception)
+        if field:
+            self.feel(field)
+        else:
+            self.look(x, y, self.depthPerception)
 
         # factor in randomness
         for d in self.nextDirection:
-            self.nextDirection[d] = self.nextDirection[d] + random.randint(0,self.randomness)
+            self.nextDirection[d] = self.nextDirection[d] + rng.randint(0,self.randomness)
             
         # report if debugging
         if DEBUG == True:
@@ -412,42 +516,53 @@ class Opponent(Snake):
         
     def look(self, x, y, depth):
         """
-        recursively looks in all directions unless depth is exhausted.
-        visited coords are ignored.
-        coords containing a snake are affected by avoidSnake variable
+        Looks at cells around (x,y) breadth first, up to depth - 1 steps away (paths stay on board).
+        Coords containing a fruit are affected by goal; coords containing a snake are affected by avoidSnake variable.
+        Each cell is looked at once; grid is not changed.
         """
-        if depth < 1:
+        grid = self.grid
+        visited = self.visited
+        self.lookCount = self.lookCount + 1
+        stamp = self.lookCount
+
+        start = getCell(x, y)
+        if depth < 1 or not BOARD[start]:
             return
-        elif self.grid.has_key((x,y)):
-            if self.grid[(x,y)] == 'visited':
-                return
-            elif self.grid[(x,y)] == 'snake':
-                if DEBUG == True:
-                    print '..snake:'
-                self.influenceDirection(x, y, self.avoidSnake)
-                self.grid[(x,y)] = 'visited'
-                self.look(x-1, y, depth -1)
-                self.look(x+1, y, depth -1)
-                self.look(x, y+1, depth -1)
-                self.look(x, y-1, depth -1)
-            elif self.grid[(x,y)] != 0:  # implied fruit
-                fruit = self.grid[(x,y)]
-                if DEBUG == True:
-                    print '..fruit: %s' % (fruit)
-                self.influenceDirection(x, y, self.goal[fruit])
-                self.grid[(x,y)] = 'visited'
-                self.look(x-1, y, depth -1)
-                self.look(x+1, y, depth -1)
-                self.look(x, y+1, depth -1)
-                self.look(x, y-1, depth -1)
-            else: #empty cell
-                self.grid[(x,y)] = 'visited'
-                self.look(x-1, y, depth -1)
-                self.look(x+1, y, depth -1)
-                self.look(x, y+1, depth -1)
-                self.look(x, y-1, depth -1)
-        else: #bound collision
+        visited[start] = stamp
+        frontier = [start]
+        while len(frontier) > 0:
+            nextFrontier = []
+            for cell in frontier:
+                if grid.fruit[cell]:
+                    fruit = FRUITTYPES[grid.fruit[cell] - 1]
+                    if DEBUG == True:
+                        print '..fruit: %s' % (fruit)
+                    self.influenceDirection(getCellX(cell), getCellY(cell), self.goal[fruit])
+                elif grid.snake[cell]:
+                    if DEBUG == True:
+                        print '..snake:'
+                    self.influenceDirection(getCellX(cell), getCellY(cell), self.avoidSnake)
+                # queue neighbors not yet visited, unless depth is exhausted
+                if depth > 1:
+                    for neighbor in (cell - 1, cell + 1, cell + STRIDE, cell - STRIDE):
+                        if BOARD[neighbor] and visited[neighbor] != stamp:
+                            visited[neighbor] = stamp
+                            nextFrontier.append(neighbor)
+            frontier = nextFrontier
+            depth = depth - 1
+
+    def feel(self, field):
+        """
+        Adjusts each direction by influence of field (InfluenceField or DistanceMaps) moving that way.
+        Fruits are weighted by goal and snakes by avoidSnake variable.
+        """
+        head = self.coords[HEAD]
+        if not BOARD[head]:
             return
+        weights = [self.goal[fruit] for fruit in FRUITTYPES] + [self.avoidSnake]
+        for direction in self.nextDirection:
+            self.nextDirection[direction] = self.nextDirection[direction] + \
+                field.getInfluence(head, head + CELLSTEP[direction], weights)
 
     def influenceDirection(self, x, y, base):
         """
@@ -521,20 +636,41 @@ class Opponent(Snake):
     def getCoords(self, axis):
         return Snake.getCoords(self, axis)
 
+    def getBody(self):
+        return Snake.getBody(self)
+
     def boundsCollision(self):
         return Snake.boundsCollision(self)
 
     def snakeCollision(self, snake):
         return Snake.snakeCollision(self, snake)
 
+    def gridCollision(self, grid):
+        return Snake.gridCollision(self, grid)
+
     def fruitCollision(self, fruit):
         return Snake.fruitCollision(self, fruit)
 
-    def move(self, trailing):
-        Snake.move(self, trailing)
+    def move(self, trailing=False, grid=False):
+        Snake.move(self, trailing, grid)
+
+    def removeTail(self, grid=False):
+        Snake.removeTail(self, grid)
+
+    def getTile(self):
+        return Snake.getTile(self)
+
+    def getCells(self, alpha=1):
+        return Snake.getCells(self, alpha)
+
+    def getSprites(self, alpha=1):
+        return Snake.getSprites(self, alpha)
 
     def drawSnake(self):
         Snake.drawSnake(self)
 
     def drawScore(self, position, allsnake):
-        Snake.drawScore(self, position, allsnake)        
+        Snake.drawScore(self, position, allsnake)
+
+    def getScoreMessage(self, position, allsnake):
+        return Snake.getScoreMessage(self, position, allsnake)        
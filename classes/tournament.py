@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+
+import itertools, math
+from const import *
+from game import Game
+from simulation import Simulation
+
+
+# game settings of each mode, as played from the main menu (see snakey_party.py)
+MODES = {'classic': {},
+         'arcade': {'apples': 20},
+         'duel': {'apples': 2, 'eggDrop': 12, 'speedTrigger': 10, 'easyTrigger': 9},
+         'fastduel': {'apples': 2, 'speedTrigger': 10, 'easyTrigger': 19, 'basespeed': 20, 'bonusFruitTrigger': 7,
+                      'eggDrop': 10, 'orangeDrop': 4},
+         'party': {'apples': 4, 'speedTrigger': 25, 'easyTrigger': 0, 'bonusFruitTrigger': 12},
+         'tron': {'trailing': True}}
+
+# AIs every tournament is played between, besides any described by the caller (see Simulation.createOpponent)
+AIS = [LINUS, WIGGLES, GOOBER]
+
+# snakes in a party match-up
+PARTYSIZE = 4
+
+
+def getName(player):
+    """
+    Returns name of player: name of AI, or 'name' of a dictionary describing one.
+    """
+    if isinstance(player, dict):
+        return player['name']
+    return player
+
+
+def getMatchups(match, roster):
+    """
+    Returns list of match-ups (lists of players) between players of roster:
+    'duel' -- every pair, each way round (start positions differ); 'party' -- every group of PARTYSIZE
+    (players may appear more than once); 'custom' -- roster itself.
+    """
+    if match == 'custom':
+        return [list(roster)]
+    elif match == 'duel':
+        return [list(matchup) for matchup in itertools.permutations(roster, 2)]
+    elif match == 'party':
+        return [list(matchup) for matchup in itertools.combinations_with_replacement(roster, PARTYSIZE)]
+    raise ValueError('Unknown match %s.' % match)
+
+
+def getJobs(matchups, settings, games, seed=0, maxticks=False):
+    """
+    Returns list of games to play: every match-up played games times, each game with a seed of its own
+    (seed, seed + 1...), so a tournament can be played again game for game.
+    """
+    jobs = []
+    for index in range(games):
+        for matchup in matchups:
+            jobs.append({'players': matchup, 'settings': settings, 'seed': seed + len(jobs), 'maxticks': maxticks})
+    return jobs
+
+
+def playGame(job):
+    """
+    Plays game described by job (see getJobs) headlessly, to its end or maxticks game iterations.
+    Returns dictionary of results: match-up, seed, game iterations run, if game ended, and for every scored snake
+    its name, score, place (see Snake.getPlace) and fruit eaten.
+    """
+    sim = Simulation(Game(seed=job['seed'], **job['settings']), job['players'])
+    sim.run(job['maxticks'])
+
+    totaldead = 0
+    totalscored = 0
+    for snake in sim.allsnake:
+        if snake.scored == True:
+            totalscored = totalscored + 1
+            if snake.alive == False:
+                totaldead = totaldead + 1
+    snakes = []
+    for snake in sim.allsnake:
+        if snake.scored == True:
+            snakes.append({'name': snake.name, 'score': snake.score, 'place': snake.getPlace(totaldead, totalscored),
+                           'fruitEaten': snake.fruitEaten})
+    return {'players': [getName(player) for player in job['players']], 'seed': job['seed'], 'ticks': sim.tick,
+            'gameover': sim.gameover, 'snakes': snakes}
+
+
+def getWinner(result):
+    """
+    Returns index (in result['snakes']) of snake that won game (see playGame): 1st place, or last one alive when game
+    was cut short. Returns None if no snake won (more than one alive when game was cut short).
+    An AI may play more than one snake of a game, so the winner is told by index rather than name.
+    """
+    alive = [index for index, snake in enumerate(result['snakes']) if snake['place'] == '1st*']
+    if len(alive) == 1:
+        return alive[0]
+    for index, snake in enumerate(result['snakes']):
+        if snake['place'] == '1st':
+            return index
+    return None
+
+
+class Standings:
+    """
+    Results of a tournament so far, by name of snake. An AI playing more than one snake of a game (a party of
+    four picks AIs with repeats) has each snake counted as a game of its own, but a game is won by one snake only.
+    games - number of games results were added from.
+    entries - dictionary of name to its totals: 'games' played (snakes played), 'wins' (1st place, or last one alive
+              when game was cut short), 'places' (count of each place),
+              'score' (sum of scores) and 'fruitEaten' (sum of fruit eaten, by fruit).
+    """
+    def __init__(self):
+        self.games = 0
+        self.entries = {}
+
+    def add(self, result):
+        """
+        Adds results of a game (see playGame).
+        """
+        self.games = self.games + 1
+        winner = getWinner(result)
+        for index, snake in enumerate(result['snakes']):
+            if snake['name'] not in self.entries:
+                self.entries[snake['name']] = {'games': 0, 'wins': 0, 'places': {}, 'score': 0, 'fruitEaten': {}}
+            entry = self.entries[snake['name']]
+            entry['games'] = entry['games'] + 1
+            if index == winner:
+                entry['wins'] = entry['wins'] + 1
+            entry['places'][snake['place']] = entry['places'].get(snake['place'], 0) + 1
+            entry['score'] = entry['score'] + snake['score']
+            for fruit in snake['fruitEaten']:
+                entry['fruitEaten'][fruit] = entry['fruitEaten'].get(fruit, 0) + snake['fruitEaten'][fruit]
+
+    def getLines(self):
+        """
+        Returns table of standings (list of lines), best win rate first: win rate, places, mean score,
+        fruit eaten per game.
+        """
+        lines = ['%-12s %6s %6s %-32s %9s  %s' % ('snake', 'games', 'wins', 'places', 'score', 'fruit eaten per game')]
+        names = sorted(self.entries, key=lambda name: -float(self.entries[name]['wins']) / self.entries[name]['games'])
+        for name in names:
+            entry = self.entries[name]
+            places = ' '.join('%s:%d' % (place, entry['places'][place]) for place in sorted(entry['places']))
+            fruit = ' '.join('%s:%.2f' % (fruit, float(entry['fruitEaten'][fruit]) / entry['games'])
+                             for fruit in sorted(entry['fruitEaten']) if entry['fruitEaten'][fruit] > 0)
+            lines.append('%-12s %6d %5.1f%% %-32s %9.1f  %s' % (name, entry['games'],
+                         100.0 * entry['wins'] / entry['games'], places, float(entry['score']) / entry['games'], fruit))
+        return lines
+
+
+class SequentialTest:
+    """
+    Sequential probability ratio test (SPRT) of whether AI a is better than AI b, judged game by game as results come
+    in, so a comparison stops as soon as it is decided rather than after a fixed number of games.
+    Tests hypothesis a is better by margin (H1) against a being no better (H0): 'wins' -- a wins games between them
+    at rate 0.5 + margin rather than 0.5 (games neither won are left out); 'score' -- a scores margin more than b
+    per game rather than the same (score differences taken as normal, with variance of those seen so far).
+    Stops once log-likelihood ratio of H1 to H0 crosses either bound, set by confidence (chance of a wrong answer is
+    1 - confidence either way).
+    Results are told apart by side (which snake of a game is a), not by name, so an AI can be compared with itself.
+    a, b - names of AIs compared.
+    test - 'wins' or 'score'.
+    margin - how much better a is (win rate over 0.5, or score per game) for it to count as better.
+    lower, upper - bounds of log-likelihood ratio, H0 accepted below lower and H1 above upper.
+    games - number of games results were added from.
+    wins - games won by a and by b (list of two).
+    differences - score of a less score of b, of every game.
+    """
+    def __init__(self, a, b, test='wins', margin=0.05, confidence=0.95):
+        if test not in ('wins', 'score'):
+            raise ValueError('Unknown test %s.' % test)
+        self.a = a
+        self.b = b
+        self.test = test
+        self.margin = margin
+        self.lower = math.log((1.0 - confidence) / confidence)
+        self.upper = math.log(confidence / (1.0 - confidence))
+        self.games = 0
+        self.wins = [0, 0]
+        self.differences = []
+
+    def add(self, result, side=0):
+        """
+        Adds results of a game between a and b (see playGame); side is index of a's snake in result['snakes']
+        (0 if a was first player of game, 1 if b was).
+        """
+        self.games = self.games + 1
+        winner = getWinner(result)
+        if winner == side:
+            self.wins[0] = self.wins[0] + 1
+        elif winner != None:
+            self.wins[1] = self.wins[1] + 1
+        self.differences.append(result['snakes'][side]['score'] - result['snakes'][1 - side]['score'])
+
+    def getRatio(self):
+        """
+        Returns log-likelihood ratio of H1 (a better by margin) to H0 (a no better), from games so far.
+        """
+        if self.test == 'wins':
+            p = 0.5 + self.margin
+            return self.wins[0] * math.log(p / 0.5) + self.wins[1] * math.log((1.0 - p) / 0.5)
+        count = len(self.differences)
+        if count < 2:
+            return 0.0
+        mean = float(sum(self.differences)) / count
+        variance = sum((difference - mean) ** 2 for difference in self.differences) / (count - 1)
+        if variance == 0:
+            return 0.0
+        return self.margin / variance * (sum(self.differences) - count * self.margin / 2.0)
+
+    def getDecision(self):
+        """
+        Returns 'better' if a is better by margin, 'not better' if it is not, False while undecided.
+        """
+        ratio = self.getRatio()
+        if ratio >= self.upper:
+            return 'better'
+        elif ratio <= self.lower:
+            return 'not better'
+        return False
+
+    def getLine(self):
+        """
+        Returns line of test so far: games, wins of each, mean score difference, log-likelihood ratio and bounds.
+        """
+        mean = 0.0
+        if len(self.differences) > 0:
+            mean = float(sum(self.differences)) / len(self.differences)
+        return '%d games: %s won %d, %s won %d, score %+.1f per game; LLR %.2f (%.2f, %.2f)' % (
+               self.games, self.a, self.wins[0], self.b, self.wins[1], mean, self.getRatio(),
+               self.lower, self.upper)
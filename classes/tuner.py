@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+
+import json, os, random
+from const import *
+from snake import GOALFRUIT
+from tournament import AIS, getJobs, Standings
+from simulation import PERSONALITIES
+
+
+# genes of an AI's personality (see Simulation.createOpponent), with range each is kept within:
+# (name, low, high); goal genes are named after their fruit
+GENES = ([('randomness', 0, 50), ('preferSameDirection', -20, 50), ('avoidSnake', -100, 20)] +
+         [(fruit, -100, 150) for fruit in GOALFRUIT])
+
+# genomes of the built-in AIs (see PERSONALITIES), a first population is started from
+BUILTIN = [list(PERSONALITIES[name][2:5]) + list(PERSONALITIES[name][5]) for name in AIS]
+
+# name AIs being tuned play under
+CANDIDATE = 'candidate'
+
+
+def getSpec(genome, name=CANDIDATE):
+    """
+    Returns dictionary describing AI of genome (list of gene values, in order of GENES), as taken by
+    Simulation.createOpponent.
+    """
+    spec = {'name': name, 'goal': {}}
+    for (gene, low, high), value in zip(GENES, genome):
+        if gene in GOALFRUIT:
+            spec['goal'][gene] = value
+        else:
+            spec[gene] = value
+    return spec
+
+
+def getMatchups(candidate, opponents, match='duel'):
+    """
+    Returns match-ups candidate is judged by: 'duel' -- against every opponent, from both starting positions;
+    'party' -- against all opponents at once.
+    """
+    if match == 'duel':
+        matchups = []
+        for opponent in opponents:
+            matchups.append([candidate, opponent])
+            matchups.append([opponent, candidate])
+        return matchups
+    elif match == 'party':
+        return [[candidate] + list(opponents)]
+    raise ValueError('Unknown match %s.' % match)
+
+
+class Population:
+    """
+    Genetic algorithm tuning an AI's personality against opponents: every generation, each genome plays the same games
+    (same match-ups and seeds -- common random numbers, so genomes are told apart by how they play rather than by
+    luck of the draw), the best are kept as they are, and the rest of the next generation is bred from the fittest:
+    picked by tournament selection, crossed over gene by gene, and mutated.
+    Games of a new generation have new seeds, so genomes are not tuned to one set of games.
+    Best genome so far (champion) plays every generation's games too, and is replaced only by a genome of the
+    generation fitter than it on those same games.
+    Population can be saved to and loaded from a checkpoint (JSON) between generations, so a run can be resumed.
+    genomes - list of genomes (lists of gene values, see GENES) of current generation.
+    generation - number of generations bred so far (0 for the first).
+    seed - seed games and breeding are drawn from (both the same for a given seed and generation).
+    fitness - list of (win rate, mean score) of each genome, once generation is evaluated; False until then.
+    history - list of dictionaries of each generation evaluated: 'generation', 'best' (genome), 'fitness' (of best),
+              'mean' (win rate of population), 'champion' (genome after generation) and 'championFitness' (on
+              generation's games).
+    champion - best genome so far, False until a generation is evaluated.
+    elite - number of best genomes kept as they are into next generation.
+    mutation - chance of each gene being mutated.
+    """
+    def __init__(self, size=16, seed=0, elite=2, mutation=0.2):
+        self.seed = seed
+        self.generation = 0
+        self.elite = elite
+        self.mutation = mutation
+        self.fitness = False
+        self.history = []
+        self.champion = False
+        rng = self.getRandom()
+        self.genomes = [list(genome) for genome in BUILTIN[:size]]
+        while len(self.genomes) < size:
+            self.genomes.append([rng.randint(low, high) for gene, low, high in GENES])
+
+    def getRandom(self):
+        """
+        Returns random generator of current generation.
+        """
+        return random.Random(self.seed * 1000003 + self.generation)
+
+    def getJobs(self, opponents, settings, games, match='duel', maxticks=False):
+        """
+        Returns list of (genome index, game to play) of current generation: every genome plays games of each of
+        its match-ups (see getMatchups), all genomes on the same seeds. Champion, if any, plays them as genome
+        index len(genomes).
+        """
+        genomes = list(self.genomes)
+        if self.champion != False:
+            genomes.append(self.champion)
+        jobs = []
+        for index, genome in enumerate(genomes):
+            matchups = getMatchups(getSpec(genome), opponents, match)
+            seed = self.seed * 1000003 + self.generation * games * len(matchups)
+            for job in getJobs(matchups, settings, games, seed, maxticks):
+                jobs.append((index, job))
+        return jobs
+
+    def evaluate(self, jobs, results):
+        """
+        Sets fitness of every genome from results of its games (results of playGame, in order of jobs),
+        replaces champion with best genome of generation if it did better on them, and records both in history.
+        """
+        standings = [Standings() for genome in self.genomes + [self.champion]]
+        for (index, job), result in zip(jobs, results):
+            standings[index].add(result)
+        allFitness = []
+        for standing in standings:
+            entry = standing.entries.get(CANDIDATE, False)
+            if entry == False:
+                allFitness.append((0.0, 0.0))
+            else:
+                allFitness.append((float(entry['wins']) / entry['games'], float(entry['score']) / entry['games']))
+        self.fitness = allFitness[:len(self.genomes)]
+        best = self.getRanking()[0]
+        championFitness = allFitness[-1]
+        if self.champion == False or self.fitness[best] > championFitness:
+            self.champion = list(self.genomes[best])
+            championFitness = self.fitness[best]
+        self.history.append({'generation': self.generation, 'best': self.genomes[best],
+                             'fitness': list(self.fitness[best]),
+                             'mean': sum(fitness[0] for fitness in self.fitness) / len(self.fitness),
+                             'champion': self.champion, 'championFitness': list(championFitness)})
+
+    def getRanking(self):
+        """
+        Returns indexes of genomes, fittest (highest win rate, then mean score) first.
+        """
+        return sorted(range(len(self.genomes)), key=lambda index: self.fitness[index], reverse=True)
+
+    def getBest(self):
+        """
+        Returns best genome so far (champion), False if no generation was evaluated.
+        """
+        return self.champion
+
+    def breed(self):
+        """
+        Replaces genomes with next generation, bred from genomes of current one (which must be evaluated).
+        """
+        ranking = self.getRanking()
+        self.generation = self.generation + 1
+        rng = self.getRandom()
+        genomes = [list(self.genomes[index]) for index in ranking[:self.elite]]
+        while len(genomes) < len(self.genomes):
+            mother = self.select(rng)
+            father = self.select(rng)
+            genomes.append(self.mutate([rng.choice(genes) for genes in zip(mother, father)], rng))
+        self.genomes = genomes
+        self.fitness = False
+
+    def select(self, rng, size=3):
+        """
+        Returns fittest of size genomes picked at random (tournament selection).
+        """
+        picked = [rng.randrange(len(self.genomes)) for count in range(size)]
+        return self.genomes[max(picked, key=lambda index: self.fitness[index])]
+
+    def mutate(self, genome, rng):
+        """
+        Returns genome with each gene, by chance of mutation, moved by a random amount (a tenth of its range
+        or so), kept within its range.
+        """
+        mutated = []
+        for (gene, low, high), value in zip(GENES, genome):
+            if rng.random() < self.mutation:
+                value = int(round(value + rng.gauss(0, (high - low) / 10.0)))
+                value = min(max(value, low), high)
+            mutated.append(value)
+        return mutated
+
+    def save(self, path):
+        """
+        Writes population to checkpoint file at path (replacing it only once written whole).
+        """
+        f = open(path + '.tmp', 'w')
+        json.dump({'seed': self.seed, 'generation': self.generation, 'elite': self.elite, 'mutation': self.mutation,
+                   'genes': [gene for gene, low, high in GENES], 'genomes': self.genomes, 'fitness': self.fitness,
+                   'champion': self.champion, 'history': self.history}, f, indent=1)
+        f.close()
+        os.rename(path + '.tmp', path)
+
+    @staticmethod
+    def load(path):
+        """
+        Returns population read from checkpoint file at path.
+        """
+        f = open(path)
+        saved = json.load(f)
+        f.close()
+        if saved['genes'] != [gene for gene, low, high in GENES]:
+            raise ValueError('Checkpoint %s holds other genes.' % path)
+        population = Population(0, saved['seed'], saved['elite'], saved['mutation'])
+        population.generation = saved['generation']
+        population.genomes = saved['genomes']
+        population.history = saved['history']
+        population.champion = saved['champion']
+        population.fitness = saved['fitness']
+        if population.fitness != False:
+            population.fitness = [tuple(fitness) for fitness in population.fitness]
+        return population
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Plays back a game of Snakey Party recorded to a replay file.
+# Games are recorded when SNAKEY_REPLAYDIR is set to a directory (see classes/replay.py).
+# python replay.py file [--render]
+# Without --render, game is rebuilt headlessly at full speed; with it, game is shown at the pace it was played.
+
+import time, sys
+from classes.replay import Replay
+
+if len(sys.argv) < 2:
+    print("usage: python replay.py file [--render]")
+    sys.exit(1)
+replay = Replay(sys.argv[1])
+render = '--render' in sys.argv[2:]
+
+# board size is read from arguments when const is imported, so it is set to that of the recording first
+sys.argv = [sys.argv[0], str(replay.width), str(replay.height)]
+import pygame
+from pygame.locals import *
+import classes.const
+if render:
+    classes.const.initDisplay()
+from classes.const import *
+from classes.methods import *
+from classes.game import Game
+from classes.simulation import Simulation
+from classes.loop import Timestep
+
+
+def advance(replay, sim):
+    """
+    Runs next game iteration recorded. Returns False once game is over, or recording is.
+    """
+    replay.applyEvents(sim)
+    if replay.isOver(sim):
+        return False
+    sim.step()
+    return sim.gameover == False
+
+
+def playback(replay, render=False):
+    """
+    Runs game recorded in replay to its end. Returns Simulation it was run in.
+    If render, game iterations are run at game speed and frames drawn at RENDER_FPS (as in rungame).
+    """
+    game = Game(**replay.getGameSettings())
+    sim = Simulation(game, replay.players)
+    timestep = Timestep()
+    running = True
+    while running:
+        if render == False:
+            running = advance(replay, sim)
+            continue
+        for event in pygame.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and \
+               (event.key == K_ESCAPE or event.key == K_q)):
+                terminate()
+        timestep.advance(game.currentspeed)
+        while running and timestep.checkStep(game.currentspeed):
+            running = advance(replay, sim)
+        if running:
+            game.drawScreen(sim.allfruit, sim.allsnake, sim.player, timestep.getAlpha(game.currentspeed))
+            FPSCLOCK.tick(RENDER_FPS)
+    return sim
+
+
+def main():
+    if render:
+        pygame.display.set_caption('Snakey Party - replay')
+    start = time.time()
+    sim = playback(replay, render)
+    elapsed = time.time() - start
+
+    if render:
+        showGameStats(sim.allsnake)
+        terminate()
+    print("%d game iterations in %.2f seconds (%.0f per second)" % (sim.tick, elapsed, sim.tick / max(elapsed, 0.000001)))
+    for snake in sim.allsnake:
+        if snake.scored:
+            print("%s: score %d, place %s" % (snake.name, snake.score, snake.place))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,10 @@
 # snake size, and other in-game effects.
 # Includes various Snake AIs and game modes (Arcade, Duel, Party).
 
-import copy, random, pygame, sys
+import copy, os, random, time, pygame, sys
 from pygame.locals import *
+import classes.const
+classes.const.initDisplay()
 from classes.const import *
 from classes.methods import *
 from classes.button import *
@@ -14,14 +16,19 @@ from classes.snake import *
 from classes.fruit import *
 from classes.gamedata import *
 from classes.game import Game
+from classes.simulation import Simulation
+from classes.replay import Recorder
+from classes.metrics import Metrics
+from classes.loop import *
+from classes.controls import *
+
+# timers and counters of every game played, if a metrics file is set
+metrics = False
+if METRICSFILE != False:
+    metrics = Metrics()
             
 
 def main():
-    #global FPSCLOCK, DISPLAYSURF, DEBUG
-
-    #pygame.init()
-    #FPSCLOCK = pygame.time.Clock()
-    #DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
     pygame.display.set_caption('Snakey Party')
     col_header = WINDOWWIDTH * 1/2
     col_one = WINDOWWIDTH * 1/3
@@ -69,13 +76,17 @@ def main():
     buttonlist.append(ibutton)
 
     
+    redraw = True
     while True:
-        DISPLAYSURF.fill(BACKGROUNDCOLOR)
-        drawTitle('Snakey Party', col_header, row_header, XLARGETITLE, GREEN, True)
-        for button in buttonlist:
-            button.display()
-            
-        for event in pygame.event.get():
+        if redraw:
+            DISPLAYSURF.fill(BACKGROUNDCOLOR)
+            drawTitle('Snakey Party', col_header, row_header, XLARGETITLE, GREEN, True)
+            for button in buttonlist:
+                button.display()
+            pygame.display.update()
+
+        events = waitForEvents()
+        for event in events:
             if event.type == QUIT:
                 terminate()
             elif (event.type == KEYDOWN and event.key == K_ESCAPE):
@@ -98,184 +109,141 @@ def main():
                         showGameOverScreen()
                     elif hasattr(button, 'showinstruct'):
                         button.showinstruct()
-        
-        pygame.display.update()
-        FPSCLOCK.tick(FPS)
+        redraw = checkForRedraw(events)
 
 
 def rungame(game, players=[]):
 
-    # in game variables
-    allsnake = []
-    allfruit = []
-    nextEvent = 0
-
-    # create snakes based on name. 'player' is set to false initially to handle input
-    player = False
-    pos = 1
-    for snake in players:
-        if snake == SNAKEY:
-            player = Snake(SNAKEY, getStartCoords(pos))
-            allsnake.append(player)
-            pos = pos + 1
-        elif snake == LINUS:
-            linus = Opponent(LINUS, getStartCoords(pos), IVORY, DARKGRAY, 5, 20, -10)
-            allsnake.append(linus)
-            pos = pos + 1
-        elif snake == WIGGLES:
-            wiggles = Opponent(WIGGLES, getStartCoords(pos), SLATEBLUE, COBALTGREEN, 15, 5, -5, [60, -10, 40, 10, 25, 100, 5])
-            allsnake.append(wiggles)
-            pos = pos + 1
-        elif snake == GOOBER:
-            goober = Opponent(GOOBER, getStartCoords(pos), PINK, RED, 10, 10, -15, [30, 5, 60, 30, 35, 100, 100])
-            allsnake.append(goober)
-            pos = pos + 1
-
-    # create initial apple(s)
-    appleCounter = game.apples
-    while appleCounter > 0:
-        a = Apple(allfruit, allsnake, game)
-        allfruit.append(a)
-        appleCounter = appleCounter - 1
+    # rules of the game are run by simulation; 'player' is False if there is none, to handle input
+    sim = Simulation(game, players, metrics)
+    player = sim.player
+
+    # record game to be played back (see replay.py), if a replay directory is set
+    recorder = False
+    if REPLAYDIR != False:
+        if not os.path.isdir(REPLAYDIR):
+            os.makedirs(REPLAYDIR)
+        path = os.path.join(REPLAYDIR, time.strftime('%Y%m%d-%H%M%S') + '.replay')
+        recorder = Recorder(path, sim, players, (WINDOWWIDTH, WINDOWHEIGHT))
+
+    # game iterations run at game speed, frames are drawn at RENDER_FPS (see classes/loop.py)
+    timestep = Timestep()
+    # frames are left undrawn while they take too long, so game iterations keep up
+    budget = FrameBudget(game.maxSkip)
+    # game iterations run and frames drawn since turbo status was last shown
+    turboTicks = 0
+    turboFrames = 0
+    game.status = False
+    # turns pressed by player, taken one per game iteration
+    turns = False
+    if player != False:
+        turns = TurnQueue(player, metrics)
+
+    # menus do not tick clock while waiting for input, so first frame is timed from now
+    FPSCLOCK.tick()
+    timestep.start()
     
-    # main game loop
+    # main game loop -- one frame drawn per loop
     while True:
-    
-        # get grid representation for AIs
-        grid = getGrid(allsnake, allfruit)
+        if metrics:
+            metrics.start()
         
-        # event handling loop -- get player's direction choice
-        stop = False
-        
-        # get events in queue. This updates players direction and other key instructions (quit, debug...)
-        # if the next event after direction update suggests sharp direction change, following direction is stored.
+        # get events in queue. This queues player's turns and handles other key instructions (quit, debug...)
         for event in pygame.event.get():
             if event.type == QUIT:
                 terminate()
-            elif nextEvent != 0 and player != False:
-                player.direction = nextEvent
-                nextEvent = 0
-                stop = True
             # check for exit/quit/debug keys
             if event.type == KEYDOWN and \
                (event.key == K_ESCAPE or event.key == K_q):
                 terminate()
             elif event.type == KEYDOWN and event.key == K_e:
-                showGameStats(allsnake)
+                if recorder:
+                    recorder.close(sim)
+                if metrics:
+                    metrics.write(METRICSFILE)
+                showGameStats(sim.allsnake)
                 return 1
             elif event.type == KEYDOWN and event.key == K_g and DEBUG == True:
-                stop = True
-                debugPrintGrid(grid)
+                debugPrintGrid(sim.grid)
             # if player is dead / does not exist - check for speed controls
             elif event.type == KEYDOWN and event.key == K_f and \
                  (player == False or player.alive == False):
                 game.updateBaseSpeed(10)
                 game.updateCurrentSpeed(False, True)
+                if recorder:
+                    recorder.recordSpeed(sim, 10)
             elif event.type == KEYDOWN and event.key == K_s and \
                  (player == False or player.alive == False):
                 game.updateBaseSpeed(-10)
                 game.updateCurrentSpeed(False, True)
-
-            # if player exists - check for direction input
-            if event.type == KEYDOWN and \
-               player != False and stop == False:
-                if event.key == K_LEFT and player.direction != RIGHT:
-                    player.direction = LEFT
-                    stop = True
-                elif event.key == K_RIGHT and player.direction != LEFT:
-                    player.direction = RIGHT
-                    stop = True
-                elif event.key == K_UP and player.direction != DOWN:
-                    player.direction = UP
-                    stop = True
-                elif event.key == K_DOWN and player.direction != UP:
-                    player.direction = DOWN
-                    
-            # peak into very next event. If key suggests sharp direction change, store in nextEvent
-            elif event.type == KEYDOWN and player != False and nextEvent == 0:
-                if event.key == K_LEFT and player.direction != RIGHT:
-                    nextEvent = LEFT
-                elif event.key == K_RIGHT and player.direction != LEFT:
-                    nextEvent = RIGHT
-                elif event.key == K_UP and player.direction != DOWN:
-                    nextEvent = UP
-                elif event.key == K_DOWN and player.direction != UP:
-                    nextEvent = DOWN
-                elif event.key == K_ESCAPE or event.key == K_q:
-                    terminate()
-                elif event.key == K_g and DEBUG == True:
-                    debugPrintGrid(grid)
-                    
-        if DEBUG == True:
-            debugPause()
-        
-        # update all other snake's direction choice
-        for snake in allsnake:
-            if snake.alive and snake.player == False:
-                snake.updateDirection(grid)
-
-        # collision detection
-        for snake in allsnake:
-            # check if the snake has hit boundary
-            if snake.alive and snake.boundsCollision():
-                snake.alive = False
-            # check if snake has hit another snake
-            for othersnake in allsnake:
-                if snake.alive and snake.snakeCollision(othersnake):
-                    snake.alive = False
-
-        # check if fruit has been eaten by a snake
-        for snake in allsnake:
-            for fruit in allfruit:
-                if snake.alive and snake.fruitCollision(fruit):
-                    fruit.isEaten(snake, game)
-                    # apples have special adding properties
-                    if fruit.__class__ == Apple:
-                        # check for speed increase
-                        if game.checkSpeedTrigger():
-                            game.updateBaseSpeed(1)
-                        # check for fruit bonus drop
-                        if game.checkBonusTrigger():
-                            game.runBonusFruit(allfruit, allsnake)
-                        # run usual fruid drop
-                        game.runDrop(allfruit, allsnake)
-                    # blueberries have special speed adjusting properties
-                    elif fruit.__class__ == Blueberry:
-                        # update game frames to be 'slow' by 7 seconds
-                        game.slowtimer = game.slowtimer + game.currentspeed * 7
-                    # remove fruit
-                    allfruit.remove(fruit)
-
-        # check for snake death, update place and end game if no more snakes are alive
-        if game.checkSnakeDeath(allsnake):
-            showGameStats(allsnake)
-            return 1
-
-        # check for size changes / move snake
-        for snake in allsnake:
-            snake.move(game.trailing)
-
-        # check multiplier and adjust color and multiplier as needed
-        for snake in allsnake:
-            if snake.multipliertimer > 0:
-                snake.multipliertimer = snake.multipliertimer - 1
-                snake.setColorBorderCurrent(PURPLE)
-            else:
-                # make sure multiplier is 1, color is normal
-                snake.multiplier = 1
-                snake.resetColorBorder()
-
-        # update timers on fruits, remove if necessary
-        for fruit in allfruit:
-            if fruit.__class__ != Apple:
-                if fruit.updateTimer() == False:
-                    # if timer on Egg expires, hatch new snake
-                    if fruit.__class__ == Egg:
-                        fruit.isHatched(allsnake)
-                    allfruit.remove(fruit)
+                if recorder:
+                    recorder.recordSpeed(sim, -10)
+            # spectating - switch turbo (more game iterations per frame drawn)
+            elif event.type == KEYDOWN and event.key == K_t and \
+                 (player == False or player.alive == False):
+                timestep.setTurbo(TURBO[(TURBO.index(timestep.turbo) + 1) % len(TURBO)])
+                turboTicks = 0
+                turboFrames = 0
+                game.status = False
+                if timestep.turbo != 1:
+                    game.status = 'turbo %s (t)' % timestep.getTurboName()
+
+            # if player is alive - queue direction input
+            elif event.type == KEYDOWN and event.key in KEYDIRECTIONS and \
+                 player != False and player.alive:
+                turns.push(KEYDIRECTIONS[event.key])
+
+        if metrics:
+            metrics.lap('events')
+
+        # run game iterations due since last frame; end game if no more snakes are alive
+        timestep.advance(game.currentspeed)
+        while timestep.checkStep(game.currentspeed):
+            if DEBUG == True:
+                debugPause()
+            # take player's next turn
+            if turns:
+                turns.pop()
+            if recorder:
+                recorder.recordDirections(sim)
+
+            sim.step()
+            if sim.gameover:
+                if recorder:
+                    recorder.close(sim)
+                if metrics:
+                    metrics.write(METRICSFILE)
+                showGameStats(sim.allsnake)
+                return 1
+            turboTicks = turboTicks + 1
+
+        # show game iterations per frame drawn in turbo, every half second
+        turboFrames = turboFrames + 1
+        if timestep.turbo != 1 and turboFrames >= RENDER_FPS / 2:
+            game.status = 'turbo %s: %.1f ticks per frame (t)' % (timestep.getTurboName(), float(turboTicks) / turboFrames)
+            turboTicks = 0
+            turboFrames = 0
                     
-        # draw everything to screen
-        game.drawScreen(allfruit, allsnake, player)
+        # draw everything to screen, part way to next game iteration -- unless last frame overran (not in turbo,
+        # which sets its own frame rate); a skipped frame does not wait for the next
+        if timestep.turbo != 1 or budget.checkDraw():
+            if metrics:
+                metrics.start()
+            game.drawScreen(sim.allfruit, sim.allsnake, player, timestep.getAlpha(game.currentspeed))
+            if metrics:
+                metrics.lap('draw')
+            FPSCLOCK.tick(RENDER_FPS)
+        else:
+            FPSCLOCK.tick()
+            if metrics:
+                metrics.count('frames_skipped')
+        # rawtime is time frame took before waiting out rest of it
+        budget.update(FPSCLOCK.get_rawtime() / 1000.0)
+        if metrics:
+            metrics.observe('frame', FPSCLOCK.get_rawtime() / 1000.0)
+            metrics.count('frames')
+            if FPSCLOCK.get_rawtime() > 1000.0 / RENDER_FPS:
+                metrics.count('frames_dropped')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# python -m unittest discover tests
+
+import os, sys, unittest
+# board size is read from arguments when const is imported, so none are passed on
+sys.argv = sys.argv[:1]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# other classes modules copy DISPLAYSURF when imported, so display is opened first (whichever test module runs first)
+import classes.const
+if classes.const.DISPLAYSURF == None:
+    classes.const.initDisplay()
+import classes.simulation
+from classes.const import *
+from classes.game import Game
+from classes.simulation import Simulation
+from classes.grid import Grid, FRUITTYPES
+from classes.distance import DistanceMaps
+
+
+class TestDistanceMaps(unittest.TestCase):
+    """
+    Maps patched as snakes move (and rebuilt as fruit comes and goes) are the same as maps built from scratch.
+    """
+    def checkGame(self, seed, players, maxticks=400, **settings):
+        sim = Simulation(Game(seed=seed, perception='distance', **settings), players)
+        maps = sim.field
+        while sim.gameover == False and sim.tick < maxticks:
+            sim.step()
+            # AIs update maps before choosing; brought up to date with what last game iteration changed
+            maps.update(sim.grid)
+            built = DistanceMaps(Grid())
+            built.blocked = bytearray(1 if count else 0 for count in sim.grid.snake)
+            built.fruit = bytearray(sim.grid.fruit)
+            for index in range(len(FRUITTYPES)):
+                built.rebuild(index)
+                self.assertEqual(maps.distances[index], built.distances[index],
+                                 'map of %s differs at tick %d' % (FRUITTYPES[index], sim.tick))
+
+    def testParty(self):
+        self.checkGame(1, [LINUS, WIGGLES, GOOBER, GOOBER], apples=4)
+
+    def testBonusFruit(self):
+        self.checkGame(2, [LINUS, WIGGLES, GOOBER], apples=20, bonusFruitTrigger=2)
+
+    def testTrailing(self):
+        self.checkGame(3, [LINUS, WIGGLES, GOOBER], trailing=True)
+
+    def testEggs(self):
+        self.checkGame(4, [LINUS, GOOBER], apples=2, eggDrop=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
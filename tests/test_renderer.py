@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# python -m unittest discover tests
+
+import os, random, sys, unittest
+# board size is read from arguments when const is imported, so none are passed on
+sys.argv = sys.argv[:1]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# other classes modules copy DISPLAYSURF when imported, so display is opened first (whichever test module runs first)
+import classes.const
+if classes.const.DISPLAYSURF == None:
+    classes.const.initDisplay()
+import classes.simulation
+import pygame
+from classes.const import *
+from classes.game import Game
+from classes.simulation import Simulation
+
+
+def getPixels():
+    """
+    Returns what is on screen.
+    """
+    return pygame.image.tostring(classes.const.DISPLAYSURF, 'RGB')
+
+
+class TestRenderer(unittest.TestCase):
+    """
+    Screen drawn by redrawing only what changed (dirty rectangles) is the same as screen drawn whole,
+    every frame of a game -- including frames drawn between game iterations (snakes moving between cells),
+    and game iterations with no frame drawn.
+    """
+    def checkGame(self, seed, players, maxticks=300, **settings):
+        rng = random.Random(seed)
+        sim = Simulation(Game(seed=seed, **settings), players)
+        while sim.gameover == False and sim.tick < maxticks:
+            sim.step()
+            if sim.gameover:
+                break
+            # none to a few frames per game iteration, at random points between it and the next
+            frames = rng.choice([0, 0, 1, 2, 3])
+            for alpha in sorted(rng.choice([0.0, 0.1, 0.5, 0.9, 0.99, 1.0]) for frame in range(frames)):
+                sim.game.drawScreen(sim.allfruit, sim.allsnake, sim.player, alpha)
+                dirty = getPixels()
+                sim.game.drawFullScreen(sim.allfruit, sim.allsnake, sim.player, alpha)
+                self.assertTrue(dirty == getPixels(), 'screen differs at tick %d, alpha %s' % (sim.tick, alpha))
+
+    def testParty(self):
+        self.checkGame(1, [SNAKEY, LINUS, WIGGLES, GOOBER], apples=4, speedTrigger=25, easyTrigger=0,
+                       bonusFruitTrigger=2)
+
+    def testEggs(self):
+        self.checkGame(2, [LINUS, WIGGLES], apples=2, eggDrop=2, blueberryDrop=3)
+
+    def testTrailing(self):
+        self.checkGame(3, [SNAKEY, GOOBER, LINUS], trailing=True)
+
+    def testBonusFruit(self):
+        self.checkGame(4, [LINUS, WIGGLES, GOOBER, GOOBER], apples=20, bonusFruitTrigger=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# python -m unittest discover tests
+
+import os, random, shutil, sys, tempfile, unittest
+# board size is read from arguments when const is imported, so none are passed on
+sys.argv = sys.argv[:1]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# other classes modules copy DISPLAYSURF when imported, so display is opened first (whichever test module runs first)
+import classes.const
+if classes.const.DISPLAYSURF == None:
+    classes.const.initDisplay()
+from classes.simulation import Simulation
+from classes.const import *
+from classes.game import Game
+from classes.replay import Recorder, Replay
+from classes.tournament import MODES
+
+
+PLAYERS = [SNAKEY, LINUS, WIGGLES, GOOBER]
+
+
+def record(game, path, rng, maxticks=2000):
+    """
+    Runs a game in game, recording it to path as rungame does: player turns at random (drawn from rng), and base
+    speed is changed once. Returns state game ended in.
+    """
+    sim = Simulation(game, PLAYERS)
+    recorder = Recorder(path, sim, PLAYERS, (WINDOWWIDTH, WINDOWHEIGHT))
+    while sim.gameover == False and sim.tick < maxticks:
+        if sim.player.alive and rng.random() < 0.2:
+            sim.player.direction = rng.choice([UP, DOWN, LEFT, RIGHT])
+        if sim.tick == 50:
+            game.updateBaseSpeed(10)
+            game.updateCurrentSpeed(False, True)
+            recorder.recordSpeed(sim, 10)
+        recorder.recordDirections(sim)
+        sim.step()
+    recorder.close(sim)
+    return sim.getState()
+
+
+def playback(path):
+    """
+    Plays back replay at path as replay.py does, in a new Game. Returns state game ended in.
+    """
+    replay = Replay(path)
+    sim = Simulation(Game(**replay.getGameSettings()), replay.players)
+    while True:
+        replay.applyEvents(sim)
+        if replay.isOver(sim):
+            break
+        sim.step()
+        if sim.gameover:
+            break
+    return sim.getState()
+
+
+class TestReplay(unittest.TestCase):
+    """
+    Every game recorded plays back the same way, including games after the first run of a Game
+    (as the menu keeps one Game per mode).
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testReusedGame(self):
+        rng = random.Random(3)
+        for mode in ['party', 'duel']:
+            # no seed: a new one is picked for every run, as from the menu
+            game = Game(**MODES[mode])
+            for run in range(3):
+                path = os.path.join(self.directory, '%s-%d.replay' % (mode, run))
+                recorded = record(game, path, rng)
+                self.assertEqual(playback(path), recorded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# python -m unittest discover tests
+
+import os, sys, unittest
+# board size is read from arguments when const is imported, so none are passed on
+sys.argv = sys.argv[:1]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# other classes modules copy DISPLAYSURF when imported, so display is opened first (whichever test module runs first)
+import classes.const
+if classes.const.DISPLAYSURF == None:
+    classes.const.initDisplay()
+from classes.simulation import Simulation
+from classes.const import *
+from classes.game import Game
+from classes.tournament import MODES
+
+
+PLAYERS = [LINUS, WIGGLES, GOOBER]
+
+
+def runStates(game, players=PLAYERS, maxticks=3000):
+    """
+    Runs a game in game to its end (or maxticks); returns list of its state after every game iteration.
+    """
+    sim = Simulation(game, players)
+    states = []
+    while sim.gameover == False and sim.tick < maxticks:
+        sim.step()
+        states.append(sim.getState())
+    return states
+
+
+class TestDeterminism(unittest.TestCase):
+    """
+    A game run with the same seed plays out the same way.
+    """
+    def testSameSeed(self):
+        self.assertEqual(runStates(Game(seed=5, **MODES['party'])), runStates(Game(seed=5, **MODES['party'])))
+
+    def testReusedGame(self):
+        # menu buttons keep one Game per mode: every run of it starts over (fruit eaten, speed, places)
+        game = Game(seed=5, **MODES['party'])
+        first = runStates(game)
+        self.assertNotEqual(game.fruitEaten['apple'], 0)
+        self.assertEqual(runStates(game), first)
+        self.assertEqual(runStates(Game(seed=5, **MODES['party'])), first)
+
+    def testReusedGameOtherMode(self):
+        game = Game(seed=7, **MODES['fastduel'])
+        first = runStates(game, [LINUS, GOOBER])
+        self.assertEqual(runStates(game, [LINUS, GOOBER]), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# python -m unittest discover tests
+
+import os, sys, unittest
+# board size is read from arguments when const is imported, so none are passed on
+sys.argv = sys.argv[:1]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# other classes modules copy DISPLAYSURF when imported, so display is opened first (whichever test module runs first)
+import classes.const
+if classes.const.DISPLAYSURF == None:
+    classes.const.initDisplay()
+import classes.simulation
+from classes.tournament import SequentialTest
+
+
+def getResult(first, second):
+    """
+    Returns result of a game between two snakes of the same name: (place, score) of each.
+    """
+    return {'snakes': [{'name': 'linus', 'place': first[0], 'score': first[1]},
+                       {'name': 'linus', 'place': second[0], 'score': second[1]}]}
+
+
+class TestSequentialTest(unittest.TestCase):
+    """
+    Results are told apart by side, so an AI compared with itself still gets a sample from each side.
+    """
+    def testSameName(self):
+        test = SequentialTest('linus', 'linus')
+        # a first and wins; b first and wins; a second and wins; nobody wins
+        test.add(getResult(('1st', 30), ('2nd', 10)), 0)
+        test.add(getResult(('1st', 50), ('2nd', 20)), 1)
+        test.add(getResult(('2nd', 0), ('1st', 40)), 1)
+        test.add(getResult(('1st*', 10), ('1st*', 10)), 0)
+        self.assertEqual(test.games, 4)
+        self.assertEqual(test.wins, [2, 1])
+        self.assertEqual(test.differences, [20, -30, 40, 0])
+
+    def testDecision(self):
+        test = SequentialTest('a', 'b', 'wins', 0.1, 0.95)
+        # a wins every game, from either side
+        while test.getDecision() == False:
+            if test.games % 2 == 0:
+                test.add(getResult(('1st', 10), ('2nd', 0)), 0)
+            else:
+                test.add(getResult(('2nd', 0), ('1st', 10)), 1)
+        self.assertEqual(test.getDecision(), 'better')
+
+
+if __name__ == '__main__':
+    unittest.main()
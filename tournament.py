@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# Plays a tournament of headless Snakey Party games between AIs, in parallel on every CPU core.
+# python tournament.py [--match duel|party|custom] [--mode mode] [--players a,b,...] [--opponent json]...
+#                      [--games N] [--maxticks N] [--seed N] [--processes N] [--size WxH] [--output file] [--report N]
+# duel plays every pair of players, party every group of four, custom the players given against each other.
+# Players are linus, wiggles and goober, and AIs described with --opponent: a JSON object (or a file holding one,
+# or a list of them) such as '{"name": "greedy", "randomness": 5, "goal": {"apple": 80}}' (see
+# Simulation.createOpponent); --players picks some of them (all by default).
+# Every match-up is played --games times (10 by default), each game with a seed of its own. Results of every game
+# are written to --output (JSON lines, tournament.jsonl by default) as they come in, and standings (win rate, places,
+# score, fruit eaten) are printed every --report games (100 by default) and at the end.
+# python tournament.py --compare a,b [--test wins|score] [--margin X] [--confidence X] [--batch N] [--games N]...
+# compares two players, playing duels (both ways round) in batches of --batch games until a sequential test
+# (SPRT) decides whether a is better than b: wins more than half (plus --margin, 0.05 by default) of games either
+# wins, or (--test score) scores --margin (20 by default) more per game; at most --games games (2000 by default).
+
+import json, multiprocessing, sys, time
+from classes.options import getOption, getOpponents
+
+
+def compare(args, a, b, settings, games, seed, maxticks, processes, output):
+    """
+    Plays duels between a and b in batches until sequential test decides if a is better; returns exit code.
+    """
+    from classes.tournament import getName, getJobs, playGame, SequentialTest
+
+    test = getOption(args, '--test', 'wins')
+    margin = float(getOption(args, '--margin', {'wins': 0.05, 'score': 20}.get(test, 0)))
+    test = SequentialTest(getName(a), getName(b), test, margin, float(getOption(args, '--confidence', 0.95)))
+    batch = int(getOption(args, '--batch', 4 * processes))
+    batch = batch + batch % 2
+    print("comparing %s with %s (%s, margin %s): at most %d games, %d a batch, on %d processes" % (
+          test.a, test.b, test.test, margin, games, batch, processes))
+
+    f = open(output, 'w')
+    start = time.time()
+    pool = multiprocessing.Pool(processes)
+    try:
+        while test.getDecision() == False and test.games < games:
+            # last batch is cut to games left
+            count = min(batch, games - test.games)
+            jobs = getJobs([[a, b], [b, a]], settings, (count + 1) / 2, seed + test.games, maxticks)[:count]
+            # results are added in order played, so a comparison run again stops at the same game;
+            # games alternate a first and b first (a's snake is the second of every other game)
+            for index, result in enumerate(pool.map(playGame, jobs)):
+                f.write(json.dumps(result, sort_keys=True) + '\n')
+                test.add(result, index % 2)
+            f.flush()
+            print(test.getLine())
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("")
+        print("stopped")
+    pool.join()
+    f.close()
+
+    print("")
+    decision = test.getDecision()
+    if decision == False:
+        print("undecided after %d games (%.1f seconds)" % (test.games, time.time() - start))
+    else:
+        print("%s is %s than %s, decided after %d games (%.1f seconds)" % (test.a, decision, test.b, test.games,
+                                                                          time.time() - start))
+    print("results saved to %s" % output)
+    return 0
+
+
+def main():
+    args = sys.argv[1:]
+    width, height = getOption(args, '--size', '640x480').split('x')
+    # board size is read from arguments when const is imported, so it is set first (workers inherit it)
+    sys.argv = [sys.argv[0], width, height]
+    from classes.tournament import MODES, AIS, getName, getMatchups, getJobs, playGame, Standings
+
+    match = getOption(args, '--match', 'duel')
+    opponents = getOpponents(args)
+    roster = AIS + opponents
+    names = getOption(args, '--players', False)
+    if '--compare' in args:
+        names = getOption(args, '--compare', False)
+        match = 'custom'
+    if names != False:
+        players = dict((getName(player), player) for player in roster)
+        for name in names.split(','):
+            if name not in players:
+                print("unknown player %s" % name)
+                return 1
+        roster = [players[name] for name in names.split(',')]
+    mode = getOption(args, '--mode', 'party')
+    if match == 'duel' or (match == 'custom' and len(roster) == 2):
+        mode = getOption(args, '--mode', 'duel')
+    if mode not in MODES:
+        print("unknown mode %s (modes: %s)" % (mode, ', '.join(sorted(MODES))))
+        return 1
+
+    processes = int(getOption(args, '--processes', multiprocessing.cpu_count()))
+    output = getOption(args, '--output', 'tournament.jsonl')
+    if '--compare' in args:
+        if len(roster) != 2:
+            print("--compare takes two players")
+            return 1
+        return compare(args, roster[0], roster[1], MODES[mode], int(getOption(args, '--games', 2000)),
+                       int(getOption(args, '--seed', 0)), int(getOption(args, '--maxticks', 20000)), processes, output)
+
+    matchups = getMatchups(match, roster)
+    jobs = getJobs(matchups, MODES[mode], int(getOption(args, '--games', 10)), int(getOption(args, '--seed', 0)),
+                   int(getOption(args, '--maxticks', 20000)))
+    report = int(getOption(args, '--report', 100))
+    print("%s tournament, %s mode: %d match-ups, %d games on %d processes" % (match, mode, len(matchups), len(jobs),
+                                                                           processes))
+
+    standings = Standings()
+    f = open(output, 'w')
+    start = time.time()
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(playGame, jobs):
+            f.write(json.dumps(result, sort_keys=True) + '\n')
+            f.flush()
+            standings.add(result)
+            if standings.games % report == 0 and standings.games < len(jobs):
+                print("")
+                print("after %d of %d games (%.1f games/s):" % (standings.games, len(jobs),
+                                                                standings.games / (time.time() - start)))
+                print('\n'.join(standings.getLines()))
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("")
+        print("stopped")
+    pool.join()
+    f.close()
+
+    print("")
+    print("%d games in %.1f seconds, results saved to %s:" % (standings.games, time.time() - start, output))
+    print('\n'.join(standings.getLines()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# Tunes an AI's personality (randomness, preferSameDirection, avoidSnake, goal) with a genetic algorithm, playing
+# headless Snakey Party games against other AIs in parallel on every CPU core.
+# python tune.py [--generations N] [--population N] [--games N] [--match duel|party] [--mode mode]
+#                [--opponent json]... [--maxticks N] [--seed N] [--processes N] [--size WxH]
+#                [--checkpoint file] [--output file]
+# Every generation, each of --population genomes (16 by default) plays --games games (4 by default) of each of its
+# match-ups against linus, wiggles, goober and AIs described with --opponent (see tournament.py): duel plays each
+# of them from both starting positions, party all of them at once. All genomes of a generation play the same seeds.
+# The population is saved to --checkpoint (tune.json by default) after every generation, and a run started with
+# an existing checkpoint resumes from it. The best AI so far -- replaced only by a genome that beats it on the same
+# games -- is written to --output (tuned.json by default), ready for tournament.py --opponent.
+
+import json, multiprocessing, os, sys, time
+from classes.options import getOption, getOpponents
+
+
+def main():
+    args = sys.argv[1:]
+    width, height = getOption(args, '--size', '640x480').split('x')
+    # board size is read from arguments when const is imported, so it is set first (workers inherit it)
+    sys.argv = [sys.argv[0], width, height]
+    from classes.tournament import MODES, AIS, playGame
+    from classes.tuner import GENES, Population, getSpec
+
+    match = getOption(args, '--match', 'duel')
+    mode = getOption(args, '--mode', 'party')
+    if match == 'duel':
+        mode = getOption(args, '--mode', 'duel')
+    if mode not in MODES:
+        print("unknown mode %s (modes: %s)" % (mode, ', '.join(sorted(MODES))))
+        return 1
+    opponents = AIS + getOpponents(args)
+    generations = int(getOption(args, '--generations', 20))
+    games = int(getOption(args, '--games', 4))
+    maxticks = int(getOption(args, '--maxticks', 5000))
+    processes = int(getOption(args, '--processes', multiprocessing.cpu_count()))
+    checkpoint = getOption(args, '--checkpoint', 'tune.json')
+    output = getOption(args, '--output', 'tuned.json')
+
+    if os.path.isfile(checkpoint):
+        population = Population.load(checkpoint)
+        print("resuming from %s: generation %d" % (checkpoint, population.generation))
+    else:
+        population = Population(int(getOption(args, '--population', 16)), int(getOption(args, '--seed', 0)))
+    print("tuning %d genomes in %s mode (%s against %d AIs), %d games each per generation, on %d processes" % (
+          len(population.genomes), mode, match, len(opponents), games, processes))
+
+    start = time.time()
+    pool = multiprocessing.Pool(processes)
+    try:
+        while True:
+            if population.fitness == False:
+                jobs = population.getJobs(opponents, MODES[mode], games, match, maxticks)
+                results = pool.map(playGame, [job for index, job in jobs])
+                population.evaluate(jobs, results)
+                population.save(checkpoint)
+                best = population.history[-1]
+                print("generation %d: best wins %.1f%% (score %.1f), population wins %.1f%% -- %d games, %.1f s" % (
+                      best['generation'], 100 * best['fitness'][0], best['fitness'][1], 100 * best['mean'],
+                      len(jobs), time.time() - start))
+                print("  best so far wins %.1f%% (score %.1f) on these games: %s" % (
+                      100 * best['championFitness'][0], best['championFitness'][1],
+                      ' '.join('%s:%d' % (gene, value) for (gene, low, high), value in zip(GENES, best['champion']))))
+                f = open(output, 'w')
+                json.dump(getSpec(population.getBest(), 'tuned'), f, sort_keys=True)
+                f.close()
+            if population.generation + 1 >= generations:
+                break
+            population.breed()
+            population.save(checkpoint)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("")
+        print("stopped, resume from %s" % checkpoint)
+    pool.join()
+
+    if population.getBest() != False:
+        print("")
+        print("best so far, after generation %d, saved to %s:" % (population.history[-1]['generation'], output))
+        print(json.dumps(getSpec(population.getBest(), 'tuned'), sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())